@@ -38,7 +38,8 @@ class CustomThemeSearch:
         self.ss_scraper = SemanticScholarScraper(
             self.logger, 
             rate_limit_delay=3,
-            api_key=ss_api_key
+            api_key=ss_api_key,
+            cache_path=Settings.SEMANTIC_SCHOLAR_CACHE_PATH or None
         )
         self.openalex_scraper = OpenAlexScraper(self.logger, rate_limit_delay=1)
         
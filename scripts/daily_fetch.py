@@ -10,7 +10,7 @@ from src.config.settings import Settings
 from src.utils.logger import setup_logger
 from src.scrapers.scholar_scraper import ScholarScraper
 from src.scrapers.arxiv_scraper import ArxivScraper
-from src.database.models import init_database, get_session, Paper
+from src.database.models import init_database, get_session
 from src.database.repository import PaperRepository
 
 
@@ -25,8 +25,8 @@ def main():
     
     # Initialize database
     logger.info(f"Initializing database: {Settings.DATABASE_URL}")
-    engine = init_database(Settings.DATABASE_URL)
-    session = get_session(engine)
+    init_database(Settings.DATABASE_URL)
+    session = get_session()
     repo = PaperRepository(session)
     
     # Initialize scrapers
@@ -48,27 +48,36 @@ def main():
     all_papers = scholar_papers + arxiv_papers
     logger.info(f"Total papers fetched: {len(all_papers)}")
     
-    # Save to database
-    new_papers_count = 0
+    # Save to database: one lookup for existing IDs, one bulk insert for the rest
+    seen_ids = repo.existing_paper_ids(paper['paper_id'] for paper in all_papers)
+    to_insert = []
     duplicate_count = 0
     
     for paper_data in all_papers:
-        try:
-            # Check if paper already exists
-            if repo.exists(paper_data['paper_id']):
-                duplicate_count += 1
-                logger.debug(f"Duplicate paper skipped: {paper_data['title'][:50]}...")
-                continue
-            
-            # Create Paper object
-            paper = Paper(**paper_data)
-            repo.add_paper(paper)
-            new_papers_count += 1
-            logger.info(f"Added new paper: {paper.title[:60]}...")
-            
-        except Exception as e:
-            logger.error(f"Error saving paper: {e}")
+        if paper_data['paper_id'] in seen_ids:
+            duplicate_count += 1
+            logger.debug(f"Duplicate paper skipped: {paper_data['title'][:50]}...")
             continue
+        seen_ids.add(paper_data['paper_id'])
+        to_insert.append(paper_data)
+    
+    try:
+        new_papers_count = repo.bulk_insert_core(to_insert)
+        for paper_data in to_insert:
+            logger.info(f"Added new paper: {paper_data['title'][:60]}...")
+    except Exception as e:
+        # One bad row fails the whole executemany; retry row by row so the rest are kept
+        logger.warning(f"Bulk insert failed, saving papers one at a time: {e}")
+        session.rollback()
+        new_papers_count = 0
+        for paper_data in to_insert:
+            try:
+                repo.add_paper(paper_data)
+                new_papers_count += 1
+                logger.info(f"Added new paper: {paper_data['title'][:60]}...")
+            except Exception as e:
+                session.rollback()
+                logger.error(f"Error saving paper: {e}")
     
     # Summary
     logger.info("=" * 60)
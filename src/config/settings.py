@@ -24,12 +24,16 @@ class Settings:
     AZURE_OPENAI_API_KEY = os.getenv("AZURE_OPENAI_API_KEY", "")
     AZURE_OPENAI_DEPLOYMENT_NAME = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-4")
     AZURE_OPENAI_API_VERSION = os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview")
+    LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "8"))  # Max in-flight LLM requests
+    LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", str(DATA_DIR / "llm_cache.db"))  # Empty disables
+    LLM_CACHE_TTL_DAYS = int(os.getenv("LLM_CACHE_TTL_DAYS", "30"))
     
     # Lark Bot (飞书)
     LARK_WEBHOOK_URL = os.getenv("LARK_WEBHOOK_URL", "")
     
     # Semantic Scholar API (for higher rate limits)
     SEMANTIC_SCHOLAR_API_KEY = os.getenv("SEMANTIC_SCHOLAR_API_KEY", "")
+    SEMANTIC_SCHOLAR_CACHE_PATH = os.getenv("SEMANTIC_SCHOLAR_CACHE_PATH", str(DATA_DIR / "ss_cache.sqlite"))  # Empty disables
     
     # Scraping settings
     FETCH_LIMIT = int(os.getenv("FETCH_LIMIT", "50"))
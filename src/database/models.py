@@ -1,10 +1,10 @@
 """Database models for storing research papers"""
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Boolean, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, text
 
 Base = declarative_base()
 
@@ -13,6 +13,11 @@ class Paper(Base):
     """Research paper model"""
     
     __tablename__ = "papers"
+    __table_args__ = (
+        # Work queues: unprocessed/unpublished papers ordered by fetch time
+        Index('ix_paper_processed_fetched', 'processed', 'fetched_at'),
+        Index('ix_paper_published_processed', 'published', 'processed'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     
@@ -76,6 +81,54 @@ class Paper(Base):
             "published": self.published
         }
 
+
+# Top-cited and keyword listings order by citation_count DESC with a LIMIT;
+# walking this index in order stops after `limit` rows instead of sorting
+Index('ix_paper_citation_desc', Paper.citation_count.desc())
+
+# SQLite FTS5 index over title/abstract, kept in sync with papers by triggers
+PAPER_FTS_TABLE = "paper_fts"
+
+_PAPER_FTS_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {PAPER_FTS_TABLE}
+        USING fts5(title, abstract, content='papers', content_rowid='id')""",
+    f"""CREATE TRIGGER IF NOT EXISTS papers_fts_ai AFTER INSERT ON papers BEGIN
+        INSERT INTO {PAPER_FTS_TABLE}(rowid, title, abstract) VALUES (new.id, new.title, new.abstract);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS papers_fts_ad AFTER DELETE ON papers BEGIN
+        INSERT INTO {PAPER_FTS_TABLE}({PAPER_FTS_TABLE}, rowid, title, abstract)
+        VALUES ('delete', old.id, old.title, old.abstract);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS papers_fts_au AFTER UPDATE OF title, abstract ON papers BEGIN
+        INSERT INTO {PAPER_FTS_TABLE}({PAPER_FTS_TABLE}, rowid, title, abstract)
+        VALUES ('delete', old.id, old.title, old.abstract);
+        INSERT INTO {PAPER_FTS_TABLE}(rowid, title, abstract) VALUES (new.id, new.title, new.abstract);
+    END""",
+]
+
+
+def create_paper_fts(connection) -> bool:
+    """
+    Create the FTS5 table and sync triggers on SQLite connections
+    
+    Returns:
+        True if the FTS table was newly created
+    """
+    if connection.dialect.name != "sqlite":
+        return False
+    
+    existed = inspect(connection).has_table(PAPER_FTS_TABLE)
+    for statement in _PAPER_FTS_DDL:
+        connection.execute(text(statement))
+    return not existed
+
+
+@event.listens_for(Paper.__table__, "after_create")
+def _create_paper_fts_after_create(target, connection, **kw):
+    """Build the FTS index alongside a freshly created papers table"""
+    create_paper_fts(connection)
+
+
 # Global engine and session
 _engine = None
 _Session = None
@@ -87,6 +140,13 @@ def init_database(database_url: str = "sqlite:///data/papers.db"):
     
     _engine = create_engine(database_url, echo=False)
     Base.metadata.create_all(_engine)
+    # create_all skips existing tables, so add indexes introduced later
+    for index in Paper.__table__.indexes:
+        index.create(_engine, checkfirst=True)
+    # Existing databases: add the FTS index and backfill it from papers
+    with _engine.begin() as connection:
+        if create_paper_fts(connection):
+            connection.execute(text(f"INSERT INTO {PAPER_FTS_TABLE}({PAPER_FTS_TABLE}) VALUES ('rebuild')"))
     _Session = sessionmaker(bind=_engine)
     
     return _engine
@@ -1,17 +1,31 @@
 """Database repository for paper operations"""
 
-from typing import List, Optional, Dict, Any
+import time
+import threading
+from typing import List, Optional, Dict, Any, Iterable, Iterator, Set
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import func, or_, text
-from .models import Paper, get_session
+from sqlalchemy import func, or_, text, select, insert, table, column
+from .models import Paper, PAPER_FTS_TABLE, get_session
+from ..utils.bloom_filter import BloomFilter
+
+# Lightweight handle on the FTS5 table (not part of Base.metadata)
+_paper_fts = table(PAPER_FTS_TABLE, column("rowid"))
 
 
 class PaperRepository:
     """Repository for paper database operations"""
     
+    # Seconds a cached pending count is trusted before re-reading the database
+    # (bounds staleness from writes made by other processes, e.g. the fetcher)
+    PENDING_COUNT_TTL = 60
+    
     def __init__(self, session: Session = None):
         self.session = session or get_session()
+        self._pending_lock = threading.Lock()
+        self._pending = None
+        self._pending_synced_at = 0.0
+        self._bloom: Optional[BloomFilter] = None
 
     @staticmethod
     def _normalize_title(title: Optional[str]) -> Optional[str]:
@@ -21,38 +35,129 @@ class PaperRepository:
         trimmed = title.strip()
         return trimmed.lower() if trimmed else None
     
+    @staticmethod
+    def _paper_row(paper_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Map a scraper dict onto Paper column values"""
+        return {
+            'title': paper_data.get('title'),
+            'paper_id': paper_data.get('paper_id'),
+            'source': paper_data.get('source'),
+            'authors': paper_data.get('authors'),
+            'first_author': paper_data.get('first_author'),
+            'year': paper_data.get('year'),
+            'publication_date': paper_data.get('publication_date'),
+            'venue': paper_data.get('venue'),
+            'publisher': paper_data.get('publisher'),
+            'abstract': paper_data.get('abstract'),
+            'url': paper_data.get('url'),
+            'pdf_url': paper_data.get('pdf_url'),
+            'citation_count': paper_data.get('citation_count', 0),
+            'doi': paper_data.get('doi'),
+            'keywords': paper_data.get('keywords'),
+            'fetched_at': paper_data.get('fetched_at', datetime.utcnow()),
+            'processed': paper_data.get('processed', False),
+            'published': paper_data.get('published', False)
+        }
+    
     def add_paper(self, paper_data: Dict[str, Any]) -> Paper:
         """Add a new paper to database"""
         # Convert dict to Paper object if needed
         if isinstance(paper_data, dict):
-            paper = Paper(
-                title=paper_data.get('title'),
-                paper_id=paper_data.get('paper_id'),
-                source=paper_data.get('source'),
-                authors=paper_data.get('authors'),
-                first_author=paper_data.get('first_author'),
-                year=paper_data.get('year'),
-                publication_date=paper_data.get('publication_date'),
-                venue=paper_data.get('venue'),
-                publisher=paper_data.get('publisher'),
-                abstract=paper_data.get('abstract'),
-                url=paper_data.get('url'),
-                pdf_url=paper_data.get('pdf_url'),
-                citation_count=paper_data.get('citation_count', 0),
-                doi=paper_data.get('doi'),
-                keywords=paper_data.get('keywords'),
-                fetched_at=paper_data.get('fetched_at', datetime.utcnow()),
-                processed=paper_data.get('processed', False),
-                published=paper_data.get('published', False)
-            )
+            paper = Paper(**self._paper_row(paper_data))
         else:
             paper = paper_data
         
         self.session.add(paper)
         self.session.commit()
         self.session.refresh(paper)
+        if not paper.processed:
+            self._adjust_pending(1)
+        if self._bloom is not None:
+            self._add_to_bloom(paper.paper_id)
         return paper
     
+    def bulk_insert_core(self, papers: List[Dict[str, Any]]) -> int:
+        """
+        Insert many new papers with one Core executemany
+        
+        Skips the ORM unit of work (object construction, identity map,
+        per-row flush). Callers must filter out existing paper_ids first;
+        a conflict fails the whole batch.
+        
+        Args:
+            papers: Paper dicts as returned by the scrapers
+            
+        Returns:
+            Number of rows inserted
+        """
+        if not papers:
+            return 0
+        
+        rows = [self._paper_row(paper) for paper in papers]
+        self.session.execute(insert(Paper), rows)
+        self.session.commit()
+        
+        self._adjust_pending(sum(1 for row in rows if not row['processed']))
+        if self._bloom is not None:
+            for row in rows:
+                self._add_to_bloom(row['paper_id'])
+        return len(rows)
+    
+    def bulk_upsert_ignore(self, papers: List[Dict[str, Any]]) -> List[int]:
+        """
+        Insert papers in one statement, skipping any whose paper_id already exists
+        
+        Uses INSERT ... ON CONFLICT (paper_id) DO NOTHING RETURNING id, so the
+        existence check and the insert are a single atomic round trip and
+        concurrent writers cannot create duplicates. Other dialects fall
+        back to an IN pre-check plus a plain insert.
+        
+        Args:
+            papers: Paper dicts as returned by the scrapers
+            
+        Returns:
+            Primary keys of the rows actually inserted
+        """
+        if not papers:
+            return []
+        
+        rows = [self._paper_row(paper) for paper in papers]
+        dialect = self.session.get_bind().dialect.name
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        elif dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            dialect_insert = None
+        
+        if dialect_insert is not None:
+            stmt = (
+                dialect_insert(Paper)
+                .values(rows)
+                .on_conflict_do_nothing(index_elements=['paper_id'])
+                .returning(Paper.id, Paper.paper_id)
+            )
+            inserted = self.session.execute(stmt).all()
+        else:
+            existing = self.existing_paper_ids(row['paper_id'] for row in rows)
+            inserted = []
+            for row in rows:
+                if row['paper_id'] in existing:
+                    continue
+                result = self.session.execute(insert(Paper).values(row))
+                inserted.append((result.inserted_primary_key[0], row['paper_id']))
+        self.session.commit()
+        
+        rows_by_paper_id = {}
+        for row in rows:
+            rows_by_paper_id.setdefault(row['paper_id'], row)
+        inserted_rows = [rows_by_paper_id[paper_id] for _, paper_id in inserted]
+        self._adjust_pending(sum(1 for row in inserted_rows if not row['processed']))
+        if self._bloom is not None:
+            for row in inserted_rows:
+                self._add_to_bloom(row['paper_id'])
+        return [paper_pk for paper_pk, _ in inserted]
+    
     def get_by_paper_id(self, paper_id: str, source: str = None) -> Optional[Paper]:
         """Get paper by its unique ID and optionally source"""
         query = self.session.query(Paper).filter(Paper.paper_id == paper_id)
@@ -72,6 +177,82 @@ class PaperRepository:
             return False
         return self.session.query(Paper.id).filter(or_(*filters)).first() is not None
     
+    def existing_paper_ids(self, paper_ids: Iterable[str]) -> Set[str]:
+        """Return the subset of the given paper IDs already stored (single IN query)"""
+        ids = {paper_id for paper_id in paper_ids if paper_id}
+        if not ids:
+            return set()
+        rows = self.session.query(Paper.paper_id).filter(Paper.paper_id.in_(ids))
+        return {row[0] for row in rows}
+    
+    def existing_titles(self, titles: Iterable[str]) -> Set[str]:
+        """Return the normalized titles among the given ones already stored (single IN query)"""
+        normalized = {self._normalize_title(title) for title in titles} - {None}
+        if not normalized:
+            return set()
+        title_expr = func.lower(func.trim(Paper.title))
+        rows = self.session.query(title_expr).filter(title_expr.in_(normalized))
+        return {row[0] for row in rows}
+    
+    def warm_bloom(self, error_rate: float = 1e-4, chunk_size: int = 10000) -> BloomFilter:
+        """
+        Load every stored paper ID into a Bloom filter
+        
+        Once warmed, filter_new_papers() only sends paper IDs that hit the
+        filter to SQL. Papers added through this repository are kept in the
+        filter; IDs written by other processes are not, and a paper that slips
+        through on such an ID is dropped by the unique paper_id index on
+        insert. Titles have no such backstop, so they are always checked in SQL.
+        
+        Args:
+            error_rate: Target false-positive rate
+            chunk_size: Rows streamed per fetch while building
+            
+        Returns:
+            The filter now attached to this repository
+        """
+        self._bloom = BloomFilter(capacity=max(self.count_all(), 10000), error_rate=error_rate)
+        rows = self.session.query(Paper.paper_id).yield_per(chunk_size)
+        for (paper_id,) in rows:
+            self._add_to_bloom(paper_id)
+        return self._bloom
+    
+    def _add_to_bloom(self, paper_id: Optional[str]):
+        """Record a paper's ID in the attached filter"""
+        if paper_id:
+            self._bloom.add(paper_id)
+    
+    def filter_new_papers(self, papers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Drop papers already stored, matching by ID or normalized title
+        
+        Same semantics as calling is_duplicate() per paper, but uses two
+        bulk lookups instead of one query per paper. With a warmed Bloom
+        filter, only IDs that hit the filter are looked up; titles are always
+        confirmed in SQL since the filter misses rows from other processes.
+        
+        Args:
+            papers: Paper dicts as returned by the scrapers
+            
+        Returns:
+            Papers not yet in the database, in their original order
+        """
+        def _paper_id(paper):
+            return paper.get('paper_id') or paper.get('semantic_scholar_id')
+        
+        candidate_ids = [_paper_id(paper) for paper in papers]
+        candidate_titles = [self._normalize_title(paper.get('title')) for paper in papers]
+        if self._bloom is not None:
+            candidate_ids = [pid for pid in candidate_ids if pid and pid in self._bloom]
+        
+        existing_ids = self.existing_paper_ids(candidate_ids)
+        existing_titles = self.existing_titles(candidate_titles)
+        return [
+            paper for paper in papers
+            if _paper_id(paper) not in existing_ids
+            and self._normalize_title(paper.get('title')) not in existing_titles
+        ]
+    
     def exists(self, paper_id: str) -> bool:
         """Check if paper exists in database"""
         return self.session.query(Paper).filter(Paper.paper_id == paper_id).count() > 0
@@ -118,8 +299,11 @@ class PaperRepository:
         """Mark a paper as processed"""
         paper = self.get_by_paper_id(paper_id)
         if paper:
+            was_pending = not paper.processed
             paper.processed = True
             self.session.commit()
+            if was_pending:
+                self._adjust_pending(-1)
     
     def mark_as_published(self, paper_id: str):
         """Mark a paper as published"""
@@ -142,28 +326,56 @@ class PaperRepository:
             paper.summary_zh = summary_zh
             paper.keywords = keywords
             paper.investment_insights = insights
+            was_pending = not paper.processed
             paper.processed = True
             self.session.commit()
+            if was_pending:
+                self._adjust_pending(-1)
+    
+    def bulk_update_summaries(self, updates: List[Dict[str, Any]]):
+        """
+        Apply AI-generated content to many papers with a single commit
+        
+        Args:
+            updates: Dicts with primary key 'id' plus any of summary_zh,
+                keywords, investment_insights and processed
+        """
+        if not updates:
+            return
+        self.session.bulk_update_mappings(Paper, updates)
+        self.session.commit()
+        self._adjust_pending(-sum(1 for update in updates if update.get('processed')))
     
     def get_papers_by_keyword(self, keyword: str, limit: int = 50) -> List[Paper]:
         """Search papers by keyword in title or abstract"""
-        return (
-            self.session.query(Paper)
-            .filter(
+        query = self.session.query(Paper)
+        
+        if self.session.get_bind().dialect.name == "sqlite":
+            # FTS5 prefix-phrase match, e.g. "deep learn"* matches "Deep Learning"
+            fts_query = '"' + keyword.replace('"', '""') + '"*'
+            matching_ids = select(_paper_fts.c.rowid).where(text(f"{PAPER_FTS_TABLE} MATCH :fts_query"))
+            query = query.filter(Paper.id.in_(matching_ids)).params(fts_query=fts_query)
+        else:
+            query = query.filter(
                 (Paper.title.ilike(f"%{keyword}%")) | 
                 (Paper.abstract.ilike(f"%{keyword}%"))
             )
+        
+        return (
+            query
             .order_by(Paper.citation_count.desc())
             .limit(limit)
             .all()
         )
     
-    def get_top_cited_papers(self, days: int = 30, limit: int = 20) -> List[Paper]:
-        """Get most cited papers from recent period"""
-        cutoff_date = datetime.utcnow() - timedelta(days=days)
+    def get_top_cited_papers(self, days: Optional[int] = 30, limit: int = 20) -> List[Paper]:
+        """Get most cited papers from recent period (days=None for all time)"""
+        query = self.session.query(Paper)
+        if days is not None:
+            cutoff_date = datetime.utcnow() - timedelta(days=days)
+            query = query.filter(Paper.fetched_at >= cutoff_date)
         return (
-            self.session.query(Paper)
-            .filter(Paper.fetched_at >= cutoff_date)
+            query
             .order_by(Paper.citation_count.desc())
             .limit(limit)
             .all()
@@ -177,6 +389,28 @@ class PaperRepository:
         """Count papers waiting for AI summarization"""
         return self.session.query(Paper).filter(Paper.processed == False).count()
     
+    def pending_count(self) -> int:
+        """
+        Number of unprocessed papers, served from an in-memory counter
+        
+        The counter is hydrated from count_unprocessed() on first use and
+        re-read after PENDING_COUNT_TTL seconds; in between it is kept
+        current by this repository's own inserts and processed updates, so
+        polling an empty queue doesn't hit the database.
+        """
+        with self._pending_lock:
+            now = time.monotonic()
+            if self._pending is None or now - self._pending_synced_at > self.PENDING_COUNT_TTL:
+                self._pending = self.count_unprocessed()
+                self._pending_synced_at = now
+            return self._pending
+    
+    def _adjust_pending(self, delta: int):
+        """Apply a local write to the cached pending count (no-op until hydrated)"""
+        with self._pending_lock:
+            if self._pending is not None:
+                self._pending = max(0, self._pending + delta)
+    
     def get_all_papers(self, limit: int = None, offset: int = 0) -> List[Paper]:
         """Get all papers with optional pagination"""
         query = self.session.query(Paper).order_by(Paper.fetched_at.desc())
@@ -186,6 +420,29 @@ class PaperRepository:
             query = query.limit(limit)
         return query.all()
 
+    def iter_all_papers(self, chunk_size: int = 500) -> Iterator[Paper]:
+        """
+        Stream all papers (newest first) without materializing the full table
+        
+        Rows are fetched from the cursor and turned into ORM objects
+        chunk_size at a time, so memory stays bounded by the chunk rather
+        than the table size. Use this instead of get_all_papers() for exports
+        and other full scans.
+        
+        Args:
+            chunk_size: Number of rows buffered per fetch
+            
+        Yields:
+            Paper objects
+        """
+        query = (
+            self.session.query(Paper)
+            .order_by(Paper.fetched_at.desc())
+            .yield_per(chunk_size)
+        )
+        for paper in query:
+            yield paper
+
     def _dedupe_by_partition(self, partition_expr, filters: List[Any]) -> int:
         """Delete duplicate rows keeping the newest by fetched_at/id"""
         subquery = (
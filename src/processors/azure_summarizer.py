@@ -3,20 +3,42 @@ Azure OpenAI-based paper summarizer
 Generates Chinese summaries and investment insights
 """
 import os
+import json
+import asyncio
 import logging
-from typing import Dict, Optional
-from openai import AzureOpenAI
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+from openai import AzureOpenAI, AsyncAzureOpenAI
 
 from ..config.settings import Settings
+from .response_cache import ResponseCache
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class PaperAnalysis:
+    """Summary, insights and keywords produced by a single LLM call"""
+    summary_zh: str
+    insights: Optional[str] = None
+    keywords: Optional[str] = None
+
+
+class TruncatedResponseError(ValueError):
+    """A structured (JSON) reply was cut off at max_tokens and cannot be parsed"""
+
+
 class AzureSummarizer:
     """Generates summaries and insights using Azure OpenAI"""
     
-    def __init__(self):
-        """Initialize Azure OpenAI client"""
+    def __init__(self, cache: Optional[ResponseCache] = None):
+        """
+        Initialize Azure OpenAI client
+        
+        Args:
+            cache: Response cache to use; defaults to Settings.LLM_CACHE_PATH
+                (an empty path disables caching)
+        """
         self.endpoint = Settings.AZURE_OPENAI_ENDPOINT
         self.api_key = Settings.AZURE_OPENAI_API_KEY
         self.deployment = Settings.AZURE_OPENAI_DEPLOYMENT_NAME
@@ -33,6 +55,15 @@ class AzureSummarizer:
             api_key=self.api_key,
             api_version=self.api_version
         )
+        self.async_client = AsyncAzureOpenAI(
+            azure_endpoint=self.endpoint,
+            api_key=self.api_key,
+            api_version=self.api_version
+        )
+        
+        if cache is None and Settings.LLM_CACHE_PATH:
+            cache = ResponseCache(Settings.LLM_CACHE_PATH, ttl_days=Settings.LLM_CACHE_TTL_DAYS)
+        self.cache = cache
         
         logger.info(f"Azure OpenAI client initialized (deployment: {self.deployment})")
     
@@ -47,25 +78,11 @@ class AzureSummarizer:
             Chinese summary string, or None if generation fails
         """
         try:
-            prompt = self._build_summary_prompt(paper)
-            
-            response = self.client.chat.completions.create(
-                model=self.deployment,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "你是一位专业的科技领域研究分析师，擅长用中文撰写详细、深入的学术论文解读。你的专业范围包括：AI/机器人、新能源/电池技术、生物技术/基因编辑、量子计算等前沿科技领域。"
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
+            summary = self._complete(
+                self._build_summary_messages(paper),
                 temperature=0.7,
                 max_tokens=4500  # Increased from 3000 to allow longer, more detailed summaries
             )
-            
-            summary = response.choices[0].message.content.strip()
             logger.info(f"Generated summary for paper: {paper.get('title', 'Unknown')[:50]}...")
             return summary
             
@@ -85,25 +102,11 @@ class AzureSummarizer:
             Investment insights string, or None if generation fails
         """
         try:
-            prompt = self._build_insights_prompt(paper, summary)
-            
-            response = self.client.chat.completions.create(
-                model=self.deployment,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "你是一位科技领域的投资分析师，擅长识别 AI/机器人、新能源/电池、生物技术、量子计算等前沿领域的技术趋势和投资机会。"
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
+            insights = self._complete(
+                self._build_insights_messages(paper, summary),
                 temperature=0.7,
                 max_tokens=1200  # Increased from 800 to allow more detailed investment insights
             )
-            
-            insights = response.choices[0].message.content.strip()
             logger.info(f"Generated insights for paper: {paper.get('title', 'Unknown')[:50]}...")
             return insights
             
@@ -111,6 +114,222 @@ class AzureSummarizer:
             logger.error(f"Failed to generate investment insights: {str(e)}")
             return None
     
+    def generate_summary_and_insights(self, paper: Dict) -> Optional[PaperAnalysis]:
+        """
+        Generate Chinese summary and investment insights in one request
+        
+        The model is asked for a JSON object so both outputs share a single
+        prompt prefill and round-trip. If a long summary exhausts the shared
+        token budget the JSON is cut off, so the paper is regenerated with the
+        separate summary and insights calls, each with its own budget.
+        
+        Args:
+            paper: Dictionary containing paper metadata
+        
+        Returns:
+            PaperAnalysis, or None if generation or parsing fails
+        """
+        try:
+            analysis = self._complete(
+                self._build_combined_messages(paper),
+                parse=self.parse_analysis,
+                cache_if=self._is_complete,
+                temperature=0.7,
+                max_tokens=5700,  # Summary (4500) + insights (1200) budgets
+                response_format={"type": "json_object"}
+            )
+            logger.info(f"Generated summary and insights for paper: {paper.get('title', 'Unknown')[:50]}...")
+            return analysis
+            
+        except TruncatedResponseError as e:
+            logger.warning(f"{e} - falling back to separate summary and insights calls")
+            return self._generate_separately(paper)
+        except Exception as e:
+            logger.error(f"Failed to generate summary and insights: {str(e)}")
+            return None
+    
+    async def agenerate_summary_and_insights(self, paper: Dict) -> Optional[PaperAnalysis]:
+        """
+        Async variant of generate_summary_and_insights
+        
+        Args:
+            paper: Dictionary containing paper metadata
+        
+        Returns:
+            PaperAnalysis, or None if generation or parsing fails
+        """
+        try:
+            analysis = await self._acomplete(
+                self._build_combined_messages(paper),
+                parse=self.parse_analysis,
+                cache_if=self._is_complete,
+                temperature=0.7,
+                max_tokens=5700,
+                response_format={"type": "json_object"}
+            )
+            logger.info(f"Generated summary and insights for paper: {paper.get('title', 'Unknown')[:50]}...")
+            return analysis
+            
+        except TruncatedResponseError as e:
+            logger.warning(f"{e} - falling back to separate summary and insights calls")
+            return await asyncio.get_running_loop().run_in_executor(None, self._generate_separately, paper)
+        except Exception as e:
+            logger.error(f"Failed to generate summary and insights: {str(e)}")
+            return None
+    
+    def _generate_separately(self, paper: Dict) -> Optional[PaperAnalysis]:
+        """Generate summary then insights as two requests (fallback for truncated combined replies)"""
+        summary = self.generate_summary(paper)
+        if not summary:
+            return None
+        return PaperAnalysis(summary_zh=summary, insights=self.generate_investment_insights(paper, summary))
+    
+    def _complete(self, messages: List[Dict], parse: Callable = None,
+                  cache_if: Callable = None, **params):
+        """
+        Run a chat completion, consulting the response cache first
+        
+        Args:
+            messages: Chat messages (system + user)
+            parse: Optional callable applied to the content; the response is
+                only cached if it succeeds
+            cache_if: Optional predicate on the parsed result; the response is
+                only cached if it returns True
+            **params: Extra arguments for chat.completions.create
+        
+        Returns:
+            Response content, or parse(content) when parse is given
+        
+        Raises:
+            TruncatedResponseError: If parse is given and the reply hit max_tokens
+        """
+        key = self._cache_key(messages)
+        content = self.cache.get(key) if self.cache else None
+        
+        if content is None:
+            response = self.client.chat.completions.create(
+                model=self.deployment,
+                messages=messages,
+                **params
+            )
+            return self._store(key, response.choices[0], parse, cache_if)
+        
+        logger.info("LLM response cache hit")
+        return parse(content) if parse else content
+    
+    async def _acomplete(self, messages: List[Dict], parse: Callable = None,
+                         cache_if: Callable = None, **params):
+        """Async variant of _complete using the AsyncAzureOpenAI client"""
+        key = self._cache_key(messages)
+        content = self.cache.get(key) if self.cache else None
+        
+        if content is None:
+            response = await self.async_client.chat.completions.create(
+                model=self.deployment,
+                messages=messages,
+                **params
+            )
+            return self._store(key, response.choices[0], parse, cache_if)
+        
+        logger.info("LLM response cache hit")
+        return parse(content) if parse else content
+    
+    def _store(self, key: str, choice, parse: Callable = None, cache_if: Callable = None):
+        """Parse a fresh response choice and cache it once it is known to be valid"""
+        content = choice.message.content.strip()
+        if choice.finish_reason == 'length':
+            # Replies cut off at max_tokens are never cached, so a rerun regenerates them
+            if parse:
+                raise TruncatedResponseError("Response truncated at max_tokens")
+            logger.warning("Response truncated at max_tokens")
+            return content
+        
+        result = parse(content) if parse else content
+        if self.cache and content and (cache_if is None or cache_if(result)):
+            self.cache.set(key, content)
+        return result
+    
+    @staticmethod
+    def _is_complete(analysis: PaperAnalysis) -> bool:
+        """Only analyses with insights are cached, so a rerun can fill them in"""
+        return bool(analysis.insights)
+    
+    def _cache_key(self, messages: List[Dict]) -> str:
+        """Cache key: sha256 over deployment, system prompt and user prompt"""
+        return ResponseCache.make_key(self.deployment, *(m["content"] for m in messages))
+    
+    def build_batch_body(self, paper: Dict) -> Dict:
+        """
+        Build the request body for one paper in a Batch API input file
+        
+        Args:
+            paper: Dictionary containing paper metadata
+        
+        Returns:
+            Chat completion request body using the combined JSON prompt
+        """
+        return {
+            "model": self.deployment,
+            "messages": self._build_combined_messages(paper),
+            "temperature": 0.7,
+            "max_tokens": 5700,
+            "response_format": {"type": "json_object"}
+        }
+    
+    @staticmethod
+    def parse_analysis(content: str) -> PaperAnalysis:
+        """Parse the JSON object returned by the combined prompt"""
+        data = json.loads(content)
+        summary = (data.get('summary_zh') or '').strip()
+        if not summary:
+            raise ValueError("Response JSON is missing 'summary_zh'")
+        
+        insights = (data.get('insights') or '').strip() or None
+        keywords = data.get('keywords')
+        if isinstance(keywords, list):
+            keywords = ', '.join(str(k).strip() for k in keywords if str(k).strip())
+        
+        return PaperAnalysis(summary_zh=summary, insights=insights, keywords=keywords or None)
+    
+    def _build_summary_messages(self, paper: Dict) -> List[Dict]:
+        """Build chat messages for summary generation"""
+        return [
+            {
+                "role": "system",
+                "content": "你是一位专业的科技领域研究分析师，擅长用中文撰写详细、深入的学术论文解读。你的专业范围包括：AI/机器人、新能源/电池技术、生物技术/基因编辑、量子计算等前沿科技领域。"
+            },
+            {
+                "role": "user",
+                "content": self._build_summary_prompt(paper)
+            }
+        ]
+    
+    def _build_insights_messages(self, paper: Dict, summary: str) -> List[Dict]:
+        """Build chat messages for investment insights generation"""
+        return [
+            {
+                "role": "system",
+                "content": "你是一位科技领域的投资分析师，擅长识别 AI/机器人、新能源/电池、生物技术、量子计算等前沿领域的技术趋势和投资机会。"
+            },
+            {
+                "role": "user",
+                "content": self._build_insights_prompt(paper, summary)
+            }
+        ]
+    
+    def _build_combined_messages(self, paper: Dict) -> List[Dict]:
+        """Build chat messages for combined summary + insights generation"""
+        return [
+            {
+                "role": "system",
+                "content": "你是一位专业的科技领域研究分析师和投资分析师，擅长用中文撰写详细、深入的学术论文解读，并识别 AI/机器人、新能源/电池、生物技术、量子计算等前沿领域的技术趋势和投资机会。你只输出 JSON。"
+            },
+            {
+                "role": "user",
+                "content": self._build_combined_prompt(paper)
+            }
+        ]
+    
     def _build_summary_prompt(self, paper: Dict) -> str:
         """Build prompt for summary generation"""
         title = paper.get('title', 'Unknown')
@@ -235,3 +454,27 @@ class AzureSummarizer:
    - **风险提示**：技术风险、市场风险、政策风险各是什么？每类至少15字
 
 用中文回答，重点突出投资相关信息。**务必在分析中包含具体的行业名称（至少3个）和公司名称（至少5家），并说明理由，避免泛泛而谈。**"""
+    
+    def _build_combined_prompt(self, paper: Dict) -> str:
+        """Build prompt that requests summary, insights and keywords as JSON"""
+        summary_prompt = self._build_summary_prompt(paper)
+        
+        return f"""{summary_prompt}
+
+---
+**第二部分：投资洞察**
+
+在完成上述深度解读后，请基于你的解读，从投资角度另外撰写一份**400-600字**的投资洞察，包含：
+1. **技术成熟度**（80-100字）：当前阶段、核心技术壁垒、距离产品化还有多远
+2. **商业化潜力**（120-150字）：3-5个产品/服务方向及市场规模估计，最易落地的场景
+3. **相关行业/公司**（120-150字）：**至少3个具体行业名称和5家代表性公司名称**，并说明关联度
+4. **投资建议**（80-120字）：短期关注点、中长期机会、技术/市场/政策风险提示
+
+---
+**输出格式（必须严格遵守）**：
+只输出一个 JSON 对象，不要输出任何其他文字：
+{{
+  "summary_zh": "按第一部分格式撰写的完整中文深度解读（Markdown）",
+  "insights": "第二部分的投资洞察（Markdown）",
+  "keywords": "3-5个核心关键词，用英文逗号分隔"
+}}"""
@@ -0,0 +1,75 @@
+"""
+SQLite-backed cache for LLM responses
+Avoids re-sending identical prompts on reruns and retries
+"""
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """Key/value store for LLM completions keyed by prompt hash"""
+
+    def __init__(self, path: Union[str, Path], ttl_days: int = 30):
+        """
+        Open (or create) the cache database
+
+        Args:
+            path: SQLite file path, or ":memory:"
+            ttl_days: Entries older than this are treated as misses (0 = never expire)
+        """
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self.ttl_seconds = ttl_days * 86400
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """Build a cache key as sha256 over the given parts"""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")  # Separator so ("ab", "c") != ("a", "bc")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value, or None on a miss or expired entry"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        value, created_at = row
+        if self.ttl_seconds and time.time() - created_at > self.ttl_seconds:
+            return None
+        return value
+
+    def set(self, key: str, value: str):
+        """Store a value, replacing any existing entry"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at) VALUES (?, ?, ?)",
+                (key, value, time.time())
+            )
+            self._conn.commit()
+
+    def close(self):
+        """Close the underlying connection"""
+        with self._lock:
+            self._conn.close()
@@ -3,7 +3,10 @@
 import sys
 from pathlib import Path
 from datetime import datetime, time
+from typing import Dict, List
 from apscheduler.schedulers.blocking import BlockingScheduler
+from apscheduler.executors.pool import ThreadPoolExecutor as JobThreadPoolExecutor
+from apscheduler.executors.pool import ProcessPoolExecutor as JobProcessPoolExecutor
 from apscheduler.triggers.cron import CronTrigger
 
 # Add project root to path
@@ -24,7 +27,12 @@ class DailyPaperScheduler:
     def __init__(self):
         self.logger = setup_logger("scheduler")
         self.settings = Settings()
-        self.scheduler = BlockingScheduler()
+        # I/O-bound fetches run on threads; summarization runs in worker
+        # processes so it can overlap with the next fetch tick
+        self.scheduler = BlockingScheduler(executors={
+            'default': JobThreadPoolExecutor(4),
+            'process': JobProcessPoolExecutor(2)
+        })
         
         # Initialize database
         init_database(self.settings.database_url)
@@ -37,7 +45,8 @@ class DailyPaperScheduler:
         self.ss_scraper = SemanticScholarScraper(
             self.logger, 
             rate_limit_delay=3,
-            api_key=ss_api_key
+            api_key=ss_api_key,
+            cache_path=self.settings.SEMANTIC_SCHOLAR_CACHE_PATH or None
         )
         self.openalex_scraper = OpenAlexScraper(self.logger, rate_limit_delay=1)
         
@@ -59,7 +68,9 @@ class DailyPaperScheduler:
                 )
             self.paper_repo.ensure_unique_paper_id_index()
             
-            # Strategy: Try Semantic Scholar first, fallback to OpenAlex if rate limited
+            # Strategy: Try Semantic Scholar first, fallback to OpenAlex if rate limited.
+            # OpenAlex is only queried on failure: its crawl is rate limited too,
+            # so running it alongside would cost a full crawl on every good day.
             papers = []
             source_used = "unknown"
             
@@ -98,20 +109,15 @@ class DailyPaperScheduler:
                     self.logger.error("Both Semantic Scholar and OpenAlex failed - cannot fetch papers")
                     return 0, 0
             
+            papers = self._dedupe_by_paper_id(papers)
+            
             # Filter to top 100 by citations
             papers = papers[:100]
             self.logger.info(f"Using top {len(papers)} papers from {source_used} (sorted by citations)")
             
             # Step 2: Check which papers we already have in database (deduplication)
             self.logger.info("[2/3] Checking for duplicates...")
-            new_papers_to_add = []
-            
-            for paper in papers:
-                paper_id = paper.get('paper_id') or paper.get('semantic_scholar_id')
-                title = paper.get('title')
-                if self.paper_repo.is_duplicate(paper_id=paper_id, title=title):
-                    continue
-                new_papers_to_add.append(paper)
+            new_papers_to_add = self.paper_repo.filter_new_papers(papers)
             
             self.logger.info(f"Found {len(new_papers_to_add)} new papers not in database")
             
@@ -121,16 +127,21 @@ class DailyPaperScheduler:
             if not new_papers_to_add:
                 self.logger.info("No new papers found - all top papers already in database")
                 return 0, 0
-            today_paper = new_papers_to_add[0]
             
+            # INSERT ... ON CONFLICT DO NOTHING: if another writer stored the
+            # candidate since the check above, move on to the next one
+            new_papers = 0
             try:
-                self.paper_repo.add_paper(today_paper)
-                self.logger.info(f"Added: {today_paper['title']}")
-                self.logger.info(f"Citations: {today_paper.get('citation_count', 0)}")
-                new_papers = 1
+                for today_paper in new_papers_to_add:
+                    if self.paper_repo.bulk_upsert_ignore([today_paper]):
+                        self.logger.info(f"Added: {today_paper['title']}")
+                        self.logger.info(f"Citations: {today_paper.get('citation_count', 0)}")
+                        new_papers = 1
+                        break
+                else:
+                    self.logger.info("All new candidates were stored concurrently - nothing added")
             except Exception as e:
                 self.logger.error(f"Error storing paper: {e}")
-                new_papers = 0
             
             # Summary
             self.logger.info("="*80)
@@ -146,28 +157,61 @@ class DailyPaperScheduler:
             self.logger.error(f"Error in daily fetch: {e}", exc_info=True)
             raise
     
-    def start(self, schedule_time: str = "00:00", timezone: str = "UTC"):
+    @staticmethod
+    def _dedupe_by_paper_id(papers: List[Dict]) -> List[Dict]:
+        """Drop repeated paper IDs in a single pass, keeping the first (highest-ranked) entry"""
+        seen = set()
+        unique = []
+        for paper in papers:
+            paper_id = paper.get('paper_id') or paper.get('semantic_scholar_id')
+            if paper_id:
+                if paper_id in seen:
+                    continue
+                seen.add(paper_id)
+            unique.append(paper)
+        return unique
+    
+    def start(self, schedule_time: str = "00:00", timezone: str = "UTC", process_time: str = "03:00",
+              process_limit: int = 1):
         """
         Start the scheduler
         
         Args:
             schedule_time: Time to run daily fetch (HH:MM format)
             timezone: Timezone for scheduling (default: UTC)
+            process_time: Time to summarize unprocessed papers (HH:MM format)
+            process_limit: Papers summarized per daily run (matches the one paper fetched per day)
         """
         try:
+            # Long-running process: warm once so daily ID checks mostly skip SQL
+            # (--run-once skips this; a full scan would cost more than it saves)
+            self.paper_repo.warm_bloom()
+            
             # Parse schedule time
             hour, minute = map(int, schedule_time.split(':'))
+            process_hour, process_minute = map(int, process_time.split(':'))
             
-            # Add scheduled job
+            # Add scheduled jobs
             self.scheduler.add_job(
                 self.fetch_and_store_papers,
                 trigger=CronTrigger(hour=hour, minute=minute, timezone=timezone),
                 id='daily_paper_fetch',
                 name='Daily Paper Fetch and Store',
+                executor='default',
                 misfire_grace_time=3600  # Allow 1 hour grace time
             )
+            self.scheduler.add_job(
+                run_paper_processing,
+                trigger=CronTrigger(hour=process_hour, minute=process_minute, timezone=timezone),
+                kwargs={'limit': process_limit},
+                id='daily_paper_processing',
+                name='Daily Paper Summarization',
+                executor='process',
+                misfire_grace_time=3600
+            )
             
             self.logger.info(f"Scheduler started. Daily fetch scheduled at {schedule_time} {timezone}")
+            self.logger.info(f"Daily summarization of up to {process_limit} paper(s) scheduled at {process_time} {timezone}")
             self.logger.info("Press Ctrl+C to exit")
             
             # Run once immediately on startup (optional)
@@ -185,6 +229,20 @@ class DailyPaperScheduler:
             raise
 
 
+def run_paper_processing(limit: int = 1):
+    """
+    Scheduler job: summarize unprocessed papers in a worker process
+    
+    Module-level so the process executor can pickle it. The database
+    engine and processor are created inside the job, so each worker uses
+    its own connections rather than SQLite handles inherited over fork.
+    """
+    from src.scheduler.process_papers import PaperProcessor
+    
+    init_database(Settings().database_url)
+    PaperProcessor().process_unprocessed_papers(limit=limit)
+
+
 def main():
     """Main entry point"""
     import argparse
@@ -200,6 +258,17 @@ def main():
         default='UTC',
         help='Timezone for scheduling (default: UTC)'
     )
+    parser.add_argument(
+        '--process-time',
+        default='03:00',
+        help='Daily summarization time in HH:MM format (default: 03:00)'
+    )
+    parser.add_argument(
+        '--process-limit',
+        type=int,
+        default=1,
+        help='Papers to summarize per daily run (default: 1)'
+    )
     parser.add_argument(
         '--run-once',
         action='store_true',
@@ -214,7 +283,8 @@ def main():
         scheduler.logger.info("Running one-time fetch (no scheduling)")
         scheduler.fetch_and_store_papers()
     else:
-        scheduler.start(schedule_time=args.time, timezone=args.timezone)
+        scheduler.start(schedule_time=args.time, timezone=args.timezone, process_time=args.process_time,
+                        process_limit=args.process_limit)
 
 
 if __name__ == "__main__":
@@ -3,8 +3,13 @@ Process unprocessed papers with Azure OpenAI
 Generates Chinese summaries and investment insights
 """
 import sys
+import json
+import argparse
+import time
+import asyncio
 import logging
 from pathlib import Path
+from typing import Dict, List, Optional
 
 # Add project root to Python path
 project_root = Path(__file__).resolve().parent.parent.parent
@@ -32,17 +37,33 @@ logger = logging.getLogger(__name__)
 class PaperProcessor:
     """Process papers with AI summarization"""
     
-    def __init__(self):
+    # Minimum backlog size before --all runs are sent through the Batch API
+    BATCH_API_THRESHOLD = 20
+    # Rows written per bulk UPDATE + commit
+    BULK_UPDATE_CHUNK_SIZE = 100
+    
+    def __init__(self, concurrency_limit: int = None):
         self.paper_repo = PaperRepository()
         self.summarizer = AzureSummarizer()
+        self.concurrency_limit = concurrency_limit or Settings.LLM_CONCURRENCY
     
-    def process_unprocessed_papers(self, limit: int = None):
+    def process_unprocessed_papers(self, limit: int = None, use_batch: bool = False):
         """
         Process all unprocessed papers (or up to limit)
         
+        LLM calls for different papers run concurrently, bounded by
+        concurrency_limit in-flight papers at a time.
+        
         Args:
             limit: Maximum number of papers to process (None = all)
+            use_batch: Send the run through the Batch API when the backlog
+                exceeds BATCH_API_THRESHOLD (slower, half the cost)
         """
+        # Cheap in-memory check first; skips the queue query when nothing is pending
+        if self.paper_repo.pending_count() == 0:
+            logger.info("No unprocessed papers found")
+            return
+        
         # Get unprocessed papers
         unprocessed = self.paper_repo.get_unprocessed(limit=limit)
         
@@ -52,61 +73,174 @@ class PaperProcessor:
         
         logger.info(f"Found {len(unprocessed)} unprocessed paper(s)")
         
-        # Process each paper
-        for paper in unprocessed:
-            logger.info(f"\n{'='*80}")
-            logger.info(f"Processing: {paper.title}")
-            logger.info(f"Citations: {paper.citation_count}")
-            logger.info(f"{'='*80}\n")
-            
-            # Convert to dict for summarizer
-            paper_dict = {
-                'title': paper.title,
-                'abstract': paper.abstract,
-                'authors': paper.authors,
-                'year': paper.year,
-                'venue': paper.venue,
-                'citation_count': paper.citation_count
-            }
-            
-            # Generate Chinese summary
-            logger.info("Generating Chinese summary...")
-            summary = self.summarizer.generate_summary(paper_dict)
+        if use_batch and len(unprocessed) > self.BATCH_API_THRESHOLD:
+            self.process_via_batch_api(unprocessed)
+            return
+        
+        results = asyncio.run(self._process_batch(unprocessed))
+        updates = []
+        
+        for paper, result in zip(unprocessed, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error processing {paper.title}: {result}")
+            elif result:
+                updates.append(result)
+        
+        self._save_updates(updates)
+        processed = len(updates)
+        
+        logger.info(f"\n{'='*80}")
+        logger.info(f"Processing complete: {processed}/{len(unprocessed)} paper(s) processed")
+        logger.info(f"{'='*80}\n")
+    
+    async def _process_batch(self, papers: List) -> List:
+        """Run _process_one for every paper with bounded concurrency"""
+        sem = asyncio.Semaphore(self.concurrency_limit)
+        
+        async def bounded(paper):
+            async with sem:
+                return await self._process_one(paper)
+        
+        tasks = [bounded(paper) for paper in papers]
+        return await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def _process_one(self, paper) -> Optional[Dict]:
+        """
+        Generate summary and insights for a single paper
+        
+        Returns:
+            Update mapping for bulk_update_summaries, or None if generation failed
+        """
+        logger.info(f"Processing: {paper.title} (citations: {paper.citation_count})")
+        
+        paper_dict = self._paper_to_dict(paper)
+        
+        # Generate Chinese summary and investment insights in one call
+        analysis = await self.summarizer.agenerate_summary_and_insights(paper_dict)
+        
+        if not analysis:
+            logger.warning(f"Failed to generate summary for: {paper.title}")
+            return None
+        
+        if not analysis.insights:
+            logger.warning(f"Failed to generate insights for: {paper.title}")
+            # Still save the summary even if insights failed
+        
+        logger.info(f"✅ Successfully processed: {paper.title[:50]}...")
+        logger.info(f"\n摘要预览:\n{analysis.summary_zh[:200]}...\n")
+        
+        if analysis.insights:
+            logger.info(f"投资洞察预览:\n{analysis.insights[:200]}...\n")
+        return self._summary_update(paper, analysis)
+    
+    def process_via_batch_api(self, papers: List, poll_interval: int = 60) -> int:
+        """
+        Process papers through the Azure OpenAI Batch API
+        
+        Uploads one JSONL request per paper, waits for the batch to finish
+        (completion window is 24h) and stores every successful result.
+        
+        Args:
+            papers: Unprocessed Paper objects
+            poll_interval: Seconds between batch status checks
+        
+        Returns:
+            Number of papers updated
+        """
+        client = self.summarizer.client
+        papers_by_id = {paper.paper_id: paper for paper in papers}
+        
+        lines = [
+            json.dumps({
+                "custom_id": paper.paper_id,
+                "method": "POST",
+                "url": "/chat/completions",
+                "body": self.summarizer.build_batch_body(self._paper_to_dict(paper))
+            }, ensure_ascii=False)
+            for paper in papers
+        ]
+        
+        input_file = client.files.create(
+            file=("papers_batch.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch"
+        )
+        batch = client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/chat/completions",
+            completion_window="24h"
+        )
+        logger.info(f"Submitted batch {batch.id} with {len(papers)} paper(s)")
+        
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            time.sleep(poll_interval)
+            batch = client.batches.retrieve(batch.id)
+            logger.info(f"Batch {batch.id} status: {batch.status}")
+        
+        if batch.status != "completed" or not batch.output_file_id:
+            logger.error(f"Batch {batch.id} ended with status: {batch.status}")
+            return 0
+        
+        output = client.files.content(batch.output_file_id).text
+        updates = []
+        
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            result = json.loads(line)
+            paper = papers_by_id.get(result.get("custom_id"))
+            response = result.get("response") or {}
             
-            if not summary:
-                logger.warning(f"Failed to generate summary for: {paper.title}")
+            if paper is None or response.get("status_code") != 200:
+                logger.warning(f"Batch request failed for: {result.get('custom_id')}")
                 continue
             
-            # Generate investment insights
-            logger.info("Generating investment insights...")
-            insights = self.summarizer.generate_investment_insights(paper_dict, summary)
+            try:
+                content = response["body"]["choices"][0]["message"]["content"]
+                analysis = self.summarizer.parse_analysis(content)
+            except Exception as e:
+                logger.warning(f"Could not parse batch result for {paper.title}: {e}")
+                continue
             
-            if not insights:
+            if not analysis.insights:
                 logger.warning(f"Failed to generate insights for: {paper.title}")
-                # Still save the summary even if insights failed
-            
-            # Update paper in database
-            paper.summary_zh = summary
-            paper.investment_insights = insights
-            paper.processed = True
-            
-            self.paper_repo.session.commit()
             
-            logger.info(f"✅ Successfully processed: {paper.title[:50]}...")
-            logger.info(f"\n摘要预览:\n{summary[:200]}...\n")
-            
-            if insights:
-                logger.info(f"投资洞察预览:\n{insights[:200]}...\n")
+            updates.append(self._summary_update(paper, analysis))
         
-        logger.info(f"\n{'='*80}")
-        logger.info(f"Processing complete: {len(unprocessed)} paper(s) processed")
-        logger.info(f"{'='*80}\n")
+        self._save_updates(updates)
+        logger.info(f"Batch {batch.id} complete: {len(updates)}/{len(papers)} paper(s) processed")
+        return len(updates)
+    
+    def _save_updates(self, updates: List[Dict]):
+        """Write summary updates in chunks of BULK_UPDATE_CHUNK_SIZE"""
+        for start in range(0, len(updates), self.BULK_UPDATE_CHUNK_SIZE):
+            self.paper_repo.bulk_update_summaries(updates[start:start + self.BULK_UPDATE_CHUNK_SIZE])
+    
+    @staticmethod
+    def _summary_update(paper, analysis) -> Dict:
+        """Build the bulk update mapping for a processed paper"""
+        return {
+            'id': paper.id,
+            'summary_zh': analysis.summary_zh,
+            'keywords': analysis.keywords or paper.keywords,
+            'investment_insights': analysis.insights,
+            'processed': True
+        }
+    
+    @staticmethod
+    def _paper_to_dict(paper) -> dict:
+        """Convert a Paper row to the dict the summarizer expects"""
+        return {
+            'title': paper.title,
+            'abstract': paper.abstract,
+            'authors': paper.authors,
+            'year': paper.year,
+            'venue': paper.venue,
+            'citation_count': paper.citation_count
+        }
 
 
-def main():
-    """Main entry point"""
-    import argparse
-    
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the command-line parser for main()"""
     parser = argparse.ArgumentParser(description='Process papers with Azure OpenAI')
     parser.add_argument(
         '--limit',
@@ -119,14 +253,30 @@ def main():
         action='store_true',
         help='Process only one paper (same as --limit 1)'
     )
-    
-    args = parser.parse_args()
+    parser.add_argument(
+        '--all',
+        action='store_true',
+        help='Process every unprocessed paper; large backlogs use the Batch API'
+    )
+    return parser
+
+
+# Built once so repeated main() calls (scheduled workers, tests) only parse
+_PARSER = _build_parser()
+
+
+def main():
+    """Main entry point"""
+    args = _PARSER.parse_args()
     
     limit = 1 if args.one else args.limit
     
     try:
         processor = PaperProcessor()
-        processor.process_unprocessed_papers(limit=limit)
+        if args.all:
+            processor.process_unprocessed_papers(limit=None, use_batch=True)
+        else:
+            processor.process_unprocessed_papers(limit=limit)
     except Exception as e:
         logger.error(f"Processing failed: {str(e)}", exc_info=True)
         sys.exit(1)
@@ -1,18 +1,74 @@
 """Semantic Scholar scraper for citation data enrichment"""
 
+import re
 import time
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 from .base_scraper import BaseScraper
 
+try:
+    import ijson
+except ImportError:  # Optional: search falls back to a whole-body decode
+    ijson = None
+
+try:
+    import orjson
+except ImportError:  # Optional: faster decoding, falls back to response.json()
+    orjson = None
+
+try:
+    from requests_cache import CachedSession
+except ImportError:  # Optional: without it cache_path is ignored
+    CachedSession = None
+
+
+# (normalized key, Semantic Scholar key, default) for fields copied through as-is
+_PASSTHROUGH_FIELDS = (
+    ("title", "title", ''),
+    ("semantic_scholar_id", "paperId", ''),
+    ("year", "year", None),
+    ("venue", "venue", ''),
+    ("abstract", "abstract", ''),
+    ("citation_count", "citationCount", 0),
+    ("influential_citation_count", "influentialCitationCount", 0),
+)
+
 
 class SemanticScholarScraper(BaseScraper):
     """Scraper for Semantic Scholar API to get citation data"""
     
     BASE_URL = "https://api.semanticscholar.org/graph/v1"
     
-    def __init__(self, logger, rate_limit_delay: int = 1, api_key: Optional[str] = None):
+    # Transient statuses retried by the session adapter with exponential backoff
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    
+    # Concurrent keyword searches for keyed clients (10 req/s). Without a key only
+    # the first keyword is searched, to stay within the shared 100 req/5 min pool
+    MAX_CONCURRENT_SEARCHES_WITH_KEY = 10
+    
+    # Fields requested for full paper records (search and single-paper lookups)
+    FIELDS = ','.join((
+        'paperId', 'externalIds', 'title', 'abstract', 'venue', 'year', 'authors',
+        'citationCount', 'influentialCitationCount', 'publicationDate', 'url', 'openAccessPdf'
+    ))
+    
+    # /paper/batch accepts at most 500 ids per request
+    BATCH_SIZE = 500
+    BATCH_FIELDS = 'paperId,citationCount,influentialCitationCount'
+    
+    # Paper metadata changes slowly; cached GET responses are reused for a day
+    CACHE_EXPIRE_AFTER = timedelta(days=1)
+    
+    # New-style (2401.12345) and old-style (cs/0101001) arXiv ids, optional version
+    ARXIV_ID_RE = re.compile(r'^(\d{4}\.\d{4,5}|[a-z\-]+(?:\.[A-Z]{2})?/\d{7})(?:v\d+)?$')
+    
+    def __init__(self, logger, rate_limit_delay: int = 1, api_key: Optional[str] = None,
+                 cache_path: Optional[str] = None):
         """
         Initialize Semantic Scholar scraper
         
@@ -20,15 +76,44 @@ class SemanticScholarScraper(BaseScraper):
             logger: Logger instance
             rate_limit_delay: Delay between requests (free tier: 100 req/5min)
             api_key: Optional API key for higher rate limits
+            cache_path: SQLite file for caching GET responses (needs requests-cache; None disables)
         """
         super().__init__(logger)
         self.rate_limit_delay = rate_limit_delay
         self.api_key = api_key
         self.headers = {
-            'User-Agent': 'ResearchTracker/1.0 (mailto:research@example.com)'
+            'Accept': 'application/json',
+            'User-Agent': 'ResearchTracker/1.0 (mailto:research@example.com)',
+            **({'x-api-key': api_key} if api_key else {})
         }
-        if api_key:
-            self.headers['x-api-key'] = api_key
+        
+        # One pooled session so requests reuse keep-alive connections, with
+        # retry/backoff (honouring Retry-After on 429) handled by urllib3
+        retry = Retry(
+            total=5,
+            backoff_factor=1,
+            backoff_jitter=1,  # Desynchronise scraper instances retrying the same 429
+            backoff_max=32,
+            status_forcelist=self.RETRY_STATUSES,
+            allowed_methods=["GET", "POST"],  # POST is only used for read-only batch lookups
+            respect_retry_after_header=True,
+            raise_on_status=False  # Hand back the last response so raise_for_status() raises HTTPError
+        )
+        if cache_path and CachedSession is not None:
+            self.session = CachedSession(
+                cache_path,
+                backend='sqlite',
+                expire_after=self.CACHE_EXPIRE_AFTER,
+                allowable_methods=('GET',),
+                allowable_codes=(200,)
+            )
+        else:
+            if cache_path:
+                self.logger.warning("requests-cache not installed - Semantic Scholar responses will not be cached")
+            self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(max_retries=retry, pool_connections=16, pool_maxsize=32))
+        # Session-level defaults, so call sites don't pass (and re-merge) headers per request
+        self.session.headers.update(self.headers)
     
     def search(self, query: str, max_results: int = 100, 
                year_filter: Optional[str] = None,
@@ -54,7 +139,7 @@ class SemanticScholarScraper(BaseScraper):
             params = {
                 'query': query,
                 'limit': min(max_results, 100),
-                'fields': 'paperId,externalIds,title,abstract,venue,year,authors,citationCount,publicationDate,url,openAccessPdf'
+                'fields': self.FIELDS
             }
             
             if year_filter:
@@ -64,21 +149,23 @@ class SemanticScholarScraper(BaseScraper):
                 params['fieldsOfStudy'] = ','.join(fields_of_study)
             
             url = f"{self.BASE_URL}/paper/search"
-            response = requests.get(url, params=params, headers=self.headers, timeout=30)
+            response = self.session.get(url, params=params, timeout=30, stream=True)
             
-            if response.status_code == 200:
-                data = response.json()
-                for item in data.get('data', []):
-                    try:
-                        paper = self._normalize_paper(item)
-                        papers.append(paper)
-                    except Exception as e:
-                        self.logger.warning(f"Error processing Semantic Scholar paper: {e}")
-                        continue
-                
-                self.logger.info(f"Found {len(papers)} papers from Semantic Scholar")
-            else:
-                self.logger.error(f"Semantic Scholar API error: {response.status_code} - {response.text}")
+            try:
+                if response.status_code == 200:
+                    for item in self._iter_search_items(response, max_results):
+                        try:
+                            paper = self._normalize_paper(item)
+                            papers.append(paper)
+                        except Exception as e:
+                            self.logger.warning(f"Error processing Semantic Scholar paper: {e}")
+                            continue
+                    
+                    self.logger.info(f"Found {len(papers)} papers from Semantic Scholar")
+                else:
+                    self.logger.error(f"Semantic Scholar API error: {response.status_code} - {response.text}")
+            finally:
+                response.close()
             
             time.sleep(self.rate_limit_delay)
             
@@ -87,6 +174,29 @@ class SemanticScholarScraper(BaseScraper):
         
         return papers
     
+    @staticmethod
+    def _decode(response) -> Any:
+        """Decode a JSON response body, with orjson when it is installed"""
+        if orjson is not None:
+            return orjson.loads(response.content)
+        return response.json()
+    
+    def _iter_search_items(self, response, max_results: int):
+        """
+        Yield at most max_results raw papers from a /paper/search response
+        
+        With ijson installed the body is parsed incrementally, so papers past
+        the limit are never decoded; otherwise the whole body goes through _decode().
+        Responses replayed by requests-cache have no stream left to read (the body
+        is already in memory), so they are always decoded whole.
+        """
+        if ijson is not None and not getattr(response, 'from_cache', False):
+            response.raw.decode_content = True  # Let urllib3 undo gzip before parsing
+            items = ijson.items(response.raw, 'data.item', use_float=True)
+        else:
+            items = self._decode(response).get('data', [])
+        return islice(items, max_results)
+    
     def get_paper_by_arxiv_id(self, arxiv_id: str) -> Optional[Dict[str, Any]]:
         """
         Get paper details by arXiv ID to enrich with citation data
@@ -98,33 +208,34 @@ class SemanticScholarScraper(BaseScraper):
             Paper dict with citation data or None
             
         Raises:
-            requests.HTTPError: For non-404 HTTP errors (enables retry logic)
+            requests.HTTPError: For non-404 HTTP errors not resolved by retries
         """
         try:
-            # Clean arXiv ID (remove version if present)
-            clean_id = arxiv_id.split('v')[0] if 'v' in arxiv_id else arxiv_id
+            # Clean arXiv ID (remove trailing version like "v2" if present)
+            base, sep, version = arxiv_id.rpartition('v')
+            clean_id = base if sep and version.isdigit() else arxiv_id
             
             url = f"{self.BASE_URL}/paper/arXiv:{clean_id}"
             params = {
-                'fields': 'paperId,externalIds,title,abstract,venue,year,authors,citationCount,publicationDate,url,openAccessPdf,influentialCitationCount'
+                'fields': self.FIELDS
             }
             
-            response = requests.get(url, params=params, headers=self.headers, timeout=30)
+            response = self.session.get(url, params=params, timeout=30)
             
             if response.status_code == 200:
-                data = response.json()
+                data = self._decode(response)
                 return self._normalize_paper(data)
             elif response.status_code == 404:
                 self.logger.debug(f"Paper not found in Semantic Scholar: arXiv:{clean_id}")
                 return None
             else:
-                # Raise exception for retry logic on server errors
+                # Transient errors were already retried by the session adapter
                 self.logger.warning(f"Semantic Scholar API error for {arxiv_id}: {response.status_code}")
                 response.raise_for_status()
                 return None
                 
         except requests.HTTPError:
-            # Re-raise HTTP errors for retry logic
+            # Re-raise HTTP errors so callers can tell them from a 404
             raise
         except Exception as e:
             self.logger.error(f"Error fetching paper {arxiv_id} from Semantic Scholar: {e}")
@@ -134,84 +245,80 @@ class SemanticScholarScraper(BaseScraper):
                                      max_papers: int = 50) -> List[Dict[str, Any]]:
         """
         Enrich papers with citation data from Semantic Scholar
-        Uses rate limiting (3 seconds) to stay within free tier limits (100 req/5min)
+        Looks papers up through /paper/batch, one request per BATCH_SIZE papers
         
         Args:
-            papers: List of papers (must have 'paper_id' field with arXiv ID)
+            papers: List of papers (must have 'paper_id' field, arXiv ID or Semantic Scholar ID)
             max_papers: Maximum papers to enrich (to avoid hitting rate limits)
             
         Returns:
             List of papers enriched with citation counts
         """
-        enriched_papers = []
-        request_count = 0
-        
-        # Limit papers to enrich
         papers_to_enrich = papers[:max_papers]
+        candidates = [paper for paper in papers_to_enrich if paper.get('paper_id')]
+        enriched_count = 0
         
-        for i, paper in enumerate(papers_to_enrich, 1):
+        for start in range(0, len(candidates), self.BATCH_SIZE):
+            if start:
+                time.sleep(self.rate_limit_delay)
+            
+            chunk = candidates[start:start + self.BATCH_SIZE]
             try:
-                arxiv_id = paper.get('paper_id')
-                if not arxiv_id:
-                    enriched_papers.append(paper)
-                    continue
-                
-                # Get citation data from Semantic Scholar with retry
-                ss_data = self._get_with_retry(arxiv_id)
-                
-                if ss_data:
-                    # Update citation count
-                    paper['citation_count'] = ss_data.get('citation_count', 0)
-                    paper['influential_citation_count'] = ss_data.get('influential_citation_count', 0)
-                    paper['semantic_scholar_id'] = ss_data.get('semantic_scholar_id')
-                    self.logger.info(f"[{i}/{len(papers_to_enrich)}] Enriched '{paper['title'][:50]}...' with {paper['citation_count']} citations")
-                else:
-                    self.logger.debug(f"[{i}/{len(papers_to_enrich)}] Paper not found in Semantic Scholar: {paper['title'][:50]}...")
-                
-                enriched_papers.append(paper)
-                request_count += 1
-                
-                # Rate limiting: 3 seconds between requests (max 20 req/min)
-                # This ensures we stay well under the 100 req/5min limit
-                time.sleep(3)
-                
+                results = self._get_batch([paper['paper_id'] for paper in chunk])
             except Exception as e:
-                self.logger.warning(f"Error enriching paper: {e}")
-                enriched_papers.append(paper)
+                self.logger.warning(f"Error enriching papers {start + 1}-{start + len(chunk)}: {e}")
                 continue
+            
+            # The batch response lists papers in request order, null for unknown ids
+            for paper, ss_data in zip(chunk, results):
+                if not ss_data:
+                    self.logger.debug(f"Paper not found in Semantic Scholar: {paper.get('title', '')[:50]}...")
+                    continue
+                
+                paper['citation_count'] = ss_data.get('citationCount') or 0
+                paper['influential_citation_count'] = ss_data.get('influentialCitationCount') or 0
+                paper['semantic_scholar_id'] = ss_data.get('paperId')
+                enriched_count += 1
+        
+        enriched_papers = list(papers_to_enrich)
         
         # Add remaining papers without enrichment
         if len(papers) > max_papers:
             enriched_papers.extend(papers[max_papers:])
             self.logger.info(f"Skipped enrichment for {len(papers) - max_papers} papers to avoid rate limits")
         
-        self.logger.info(f"Enriched {request_count} papers with citation data")
+        self.logger.info(f"Enriched {enriched_count} papers with citation data")
         return enriched_papers
     
-    def _get_with_retry(self, arxiv_id: str, max_retries: int = 3) -> Optional[Dict[str, Any]]:
+    def _get_batch(self, paper_ids: List[str]) -> List[Optional[Dict[str, Any]]]:
         """
-        Get paper with exponential backoff retry on rate limit
+        Look up to BATCH_SIZE papers in one /paper/batch request
         
         Args:
-            arxiv_id: arXiv ID
-            max_retries: Maximum retry attempts
+            paper_ids: Stored paper IDs (arXiv IDs or Semantic Scholar IDs)
             
         Returns:
-            Paper dict or None
+            Raw Semantic Scholar records aligned with paper_ids (None where unknown)
+            
+        Raises:
+            requests.HTTPError: If the request still fails after the session's retries
         """
-        for attempt in range(max_retries):
-            try:
-                paper = self.get_paper_by_arxiv_id(arxiv_id)
-                return paper
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    wait_time = (2 ** attempt) * 5  # 5, 10, 20 seconds
-                    self.logger.debug(f"Retry {attempt + 1}/{max_retries} for {arxiv_id} after {wait_time}s")
-                    time.sleep(wait_time)
-                else:
-                    self.logger.warning(f"Failed to get {arxiv_id} after {max_retries} attempts")
-                    return None
-        return None
+        response = self.session.post(
+            f"{self.BASE_URL}/paper/batch",
+            params={'fields': self.BATCH_FIELDS},
+            json={'ids': [self._batch_id(paper_id) for paper_id in paper_ids]},
+            timeout=30
+        )
+        response.raise_for_status()
+        return self._decode(response)
+    
+    @classmethod
+    def _batch_id(cls, paper_id: str) -> str:
+        """Map a stored paper_id to a batch lookup ID ("ARXIV:<id>" for arXiv papers)"""
+        if paper_id.lower().startswith('arxiv:'):
+            paper_id = paper_id[len('arxiv:'):]
+        match = cls.ARXIV_ID_RE.match(paper_id)
+        return f"ARXIV:{match.group(1)}" if match else paper_id
     
     def get_recent_papers(self, keywords: List[str], days: int = 30) -> List[Dict[str, Any]]:
         """
@@ -235,27 +342,33 @@ class SemanticScholarScraper(BaseScraper):
         
         self.logger.info(f"Fetching papers from {current_year - 1} onwards (to ensure citation data)")
         
-        # OPTIMIZATION: Use only the FIRST keyword to reduce API calls and avoid rate limiting (429 errors)
-        # Semantic Scholar search is broad enough that one keyword returns diverse results
-        primary_keyword = keywords[0] if keywords else "artificial intelligence"
+        keywords = keywords or ["artificial intelligence"]
+        if not self.api_key:
+            # OPTIMIZATION: Use only the FIRST keyword to reduce API calls and avoid rate limiting (429 errors)
+            # Semantic Scholar search is broad enough that one keyword returns diverse results
+            keywords = keywords[:1]
         
-        try:
-            self.logger.info(f"Fetching Semantic Scholar papers for: '{primary_keyword}' (optimized for rate limits)")
-            
-            # Single search to avoid rate limiting
-            papers = self.search(
-                query=primary_keyword,
-                max_results=100,
-                year_filter=year_filter,
-                fields_of_study=fields
-            )
-            
-            all_papers.extend(papers)
-            
-        except Exception as e:
-            self.logger.error(f"Error fetching Semantic Scholar papers for '{primary_keyword}': {e}")
-            # Don't try other keywords to avoid more rate limiting
-            return []
+        # With a key, fan keyword searches out over the pooled session; each
+        # worker sleeps rate_limit_delay after its request
+        max_workers = min(len(keywords), self.MAX_CONCURRENT_SEARCHES_WITH_KEY)
+        self.logger.info(f"Fetching Semantic Scholar papers for {len(keywords)} keywords ({max_workers} concurrent)")
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(
+                    self.search,
+                    query=keyword,
+                    max_results=100,
+                    year_filter=year_filter,
+                    fields_of_study=fields
+                )
+                for keyword in keywords
+            ]
+            for keyword, future in zip(keywords, futures):
+                try:
+                    all_papers.extend(future.result())
+                except Exception as e:
+                    self.logger.error(f"Error fetching Semantic Scholar papers for '{keyword}': {e}")
         
         # Remove duplicates by paper_id
         unique_papers = []
@@ -283,28 +396,30 @@ class SemanticScholarScraper(BaseScraper):
         Returns:
             Normalized paper dictionary
         """
+        paper = {key: raw_paper.get(source_key, default) for key, source_key, default in _PASSTHROUGH_FIELDS}
+        
         # Extract authors
-        authors_list = raw_paper.get('authors', [])
-        authors = ', '.join([a.get('name', '') for a in authors_list if a.get('name')])
+        authors_list = raw_paper.get('authors') or ()
+        authors = ', '.join(name for name in (a.get('name') for a in authors_list) if name)
         first_author = authors_list[0].get('name', '') if authors_list else ''
         
-        # Get arXiv ID from external IDs
-        external_ids = raw_paper.get('externalIds', {})
+        # Get arXiv ID and DOI from external IDs (looked up once)
+        external_ids = raw_paper.get('externalIds') or {}
         arxiv_id = external_ids.get('ArXiv', '')
         doi = external_ids.get('DOI', '')
         
-        # Get paper ID (prefer arXiv, fallback to Semantic Scholar ID)
-        paper_id = arxiv_id or raw_paper.get('paperId', '')
-        
-        # Get URL (prefer arXiv)
-        url = f"https://arxiv.org/abs/{arxiv_id}" if arxiv_id else raw_paper.get('url', '')
-        
-        # Get PDF URL
-        pdf_url = ''
         if arxiv_id:
+            # Prefer arXiv for ID, links and publisher
+            paper_id = arxiv_id
+            url = f"https://arxiv.org/abs/{arxiv_id}"
             pdf_url = f"https://arxiv.org/pdf/{arxiv_id}"
-        elif raw_paper.get('openAccessPdf'):
-            pdf_url = raw_paper['openAccessPdf'].get('url', '')
+            source, publisher = "arxiv", "arXiv"
+        else:
+            paper_id = paper['semantic_scholar_id']
+            url = raw_paper.get('url', '')
+            open_access_pdf = raw_paper.get('openAccessPdf')
+            pdf_url = open_access_pdf.get('url', '') if open_access_pdf else ''
+            source, publisher = "semantic_scholar", paper['venue']
         
         # Parse publication date
         pub_date = raw_paper.get('publicationDate')
@@ -314,22 +429,16 @@ class SemanticScholarScraper(BaseScraper):
             except:
                 pub_date = None
         
-        return {
-            "title": raw_paper.get('title', ''),
-            "paper_id": paper_id,
-            "semantic_scholar_id": raw_paper.get('paperId', ''),
-            "source": "arxiv" if arxiv_id else "semantic_scholar",
-            "authors": authors,
-            "first_author": first_author,
-            "year": raw_paper.get('year'),
-            "publication_date": pub_date,
-            "venue": raw_paper.get('venue', ''),
-            "publisher": "arXiv" if arxiv_id else raw_paper.get('venue', ''),
-            "abstract": raw_paper.get('abstract', ''),
-            "url": url,
-            "pdf_url": pdf_url,
-            "citation_count": raw_paper.get('citationCount', 0),
-            "influential_citation_count": raw_paper.get('influentialCitationCount', 0),
-            "doi": doi,
-            "fetched_at": datetime.utcnow()
-        }
+        paper.update(
+            paper_id=paper_id,
+            source=source,
+            authors=authors,
+            first_author=first_author,
+            publication_date=pub_date,
+            publisher=publisher,
+            url=url,
+            pdf_url=pdf_url,
+            doi=doi,
+            fetched_at=datetime.utcnow()
+        )
+        return paper
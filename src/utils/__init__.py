@@ -1,5 +1,6 @@
 """Utility modules"""
 
 from .logger import setup_logger
+from .bloom_filter import BloomFilter
 
-__all__ = ["setup_logger"]
+__all__ = ["setup_logger", "BloomFilter"]
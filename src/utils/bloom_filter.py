@@ -0,0 +1,46 @@
+"""Minimal Bloom filter for fast negative membership checks"""
+
+import math
+import hashlib
+from typing import Iterable
+
+
+class BloomFilter:
+    """
+    Probabilistic set: "not in" answers are exact, "in" answers may be
+    false positives (at roughly error_rate) and need confirming elsewhere
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 1e-4):
+        """
+        Size the bit array for the expected number of items
+
+        Args:
+            capacity: Expected number of items
+            error_rate: Target false-positive probability at capacity
+        """
+        capacity = max(1, int(capacity))
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, item: str) -> Iterable[int]:
+        """Bit positions for an item via double hashing of one blake2b digest"""
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str):
+        """Add an item to the filter"""
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def update(self, items: Iterable[str]):
+        """Add many items"""
+        for item in items:
+            self.add(item)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
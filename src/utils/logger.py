@@ -1,41 +1,66 @@
 """Logging configuration"""
 
 import sys
-from pathlib import Path
+import threading
+from typing import Callable, Dict, Tuple
 from loguru import logger
 from ..config.settings import Settings
 
+# Sink ids added by setup_logger, keyed by logger name ("" for the shared
+# console sink), with the (path, level) each was configured for
+_sinks: Dict[str, Tuple[Tuple, int]] = {}
+_sinks_lock = threading.Lock()
+
 
 def setup_logger(name: str = "research-tracker") -> logger:
     """
     Set up logger with file and console output
     
+    loguru has a single global logger, so each name gets its own file sink
+    that only accepts records bound to that name. Repeat calls reuse the
+    existing sinks unless LOG_DIR or LOG_LEVEL changed since.
+    
     Args:
         name: Logger name
-        
+    
     Returns:
-        Configured logger instance
+        Logger bound to name
     """
-    # Remove default logger
-    logger.remove()
-    
-    # Console output
-    logger.add(
-        sys.stdout,
-        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan> - <level>{message}</level>",
-        level=Settings.LOG_LEVEL,
-        colorize=True
-    )
-    
-    # File output
+    level = Settings.LOG_LEVEL
     log_file = Settings.LOG_DIR / f"{name}.log"
-    logger.add(
-        log_file,
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
-        level=Settings.LOG_LEVEL,
-        rotation="1 day",
-        retention="30 days",
-        compression="zip"
-    )
     
-    return logger
+    with _sinks_lock:
+        if not _sinks:
+            # Remove default logger
+            logger.remove()
+        
+        # Console output
+        _ensure_sink("", (None, level), lambda: logger.add(
+            sys.stdout,
+            format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan> - <level>{message}</level>",
+            level=level,
+            colorize=True
+        ))
+        
+        # File output
+        _ensure_sink(name, (log_file, level), lambda: logger.add(
+            log_file,
+            format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
+            level=level,
+            filter=lambda record: record["extra"].get("name") == name,
+            rotation="1 day",
+            retention="30 days",
+            compression="zip"
+        ))
+    
+    return logger.bind(name=name)
+
+
+def _ensure_sink(key: str, config: Tuple, add: Callable[[], int]):
+    """Add the sink for key, replacing it if it was configured differently"""
+    current = _sinks.get(key)
+    if current is not None:
+        if current[0] == config:
+            return
+        logger.remove(current[1])
+    _sinks[key] = (config, add())
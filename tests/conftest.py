@@ -0,0 +1,148 @@
+"""Shared pytest configuration"""
+import io
+import json as _json
+import logging
+import sys
+from contextlib import ExitStack
+from types import SimpleNamespace
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+
+# Third-party modules the tests never exercise for real. Stubbed once for the
+# whole session rather than by each test module, so every module sees the same
+# sys.modules regardless of collection order.
+STUBBED_MODULES = (
+    "arxiv",
+    "scholarly",
+    "openai",
+    "apscheduler",
+    "apscheduler.schedulers",
+    "apscheduler.schedulers.blocking",
+    "apscheduler.schedulers.background",
+    "apscheduler.executors",
+    "apscheduler.executors.pool",
+    "apscheduler.triggers",
+    "apscheduler.triggers.cron",
+)
+
+# Installed at conftest import: test modules import src code (and so these
+# modules) during collection, before any fixture could run.
+_module_stubs = pytest.MonkeyPatch()
+for _name in STUBBED_MODULES:
+    _module_stubs.setitem(sys.modules, _name, Mock())
+
+from src.database.repository import PaperRepository  # noqa: E402
+from src.scrapers.semantic_scholar_scraper import SemanticScholarScraper  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _stub_heavy_imports():
+    """Restore the real sys.modules entries when the session ends"""
+    yield
+    _module_stubs.undo()
+
+
+SCHEDULER_PATCH_TARGETS = (
+    "init_database",
+    "PaperRepository",
+    "SemanticScholarScraper",
+    "OpenAlexScraper",
+    "BlockingScheduler",
+    "CronTrigger",
+)
+
+
+@pytest.fixture(scope="module")
+def _scheduler_patches():
+    """
+    Patch daily_scheduler's collaborators once per test module
+    
+    Module rather than session scope: tests live in one flat directory, so
+    a session-wide patch would leak into unrelated modules.
+    """
+    with ExitStack() as stack:
+        yield {
+            name: stack.enter_context(patch(f'src.scheduler.daily_scheduler.{name}'))
+            for name in SCHEDULER_PATCH_TARGETS
+        }
+
+
+# Configuration shared by scheduler tests. Kept as configure_mock-style dicts
+# rather than template Mocks: copy.copy(Mock) shares child mocks, so call
+# records would leak between tests.
+_SCHEDULER_MOCK_SHAPES = {
+    'repo': {
+        'deduplicate.return_value': {'removed_by_paper_id': 0, 'removed_by_title': 0},
+        'count_all.return_value': 10,
+        'count_unprocessed.return_value': 5,
+        'get_by_paper_id.return_value': None,
+        'filter_new_papers.side_effect': lambda papers: papers,
+    },
+    'ss': {
+        'get_recent_papers.return_value': [],
+    },
+    'sched': {},
+}
+
+
+# Specs catch typo'd or renamed collaborator methods. The scheduler has none:
+# apscheduler itself is stubbed above.
+_SCHEDULER_MOCK_SPECS = {
+    'repo': PaperRepository,
+    'ss': SemanticScholarScraper,
+    'sched': None,
+}
+
+
+@pytest.fixture
+def mock_scheduler_bundle():
+    """Fresh (repo, ss_scraper, scheduler) mocks preconfigured for scheduler tests"""
+    return tuple(
+        MagicMock(spec=_SCHEDULER_MOCK_SPECS[shape], **_SCHEDULER_MOCK_SHAPES[shape])
+        for shape in ('repo', 'ss', 'sched')
+    )
+
+
+@pytest.fixture(scope="session")
+def logger():
+    """Silent stdlib logger for components that only store and call a logger"""
+    null_logger = logging.getLogger("tests")
+    null_logger.addHandler(logging.NullHandler())
+    null_logger.propagate = False
+    return null_logger
+
+
+def _raise(exc):
+    raise exc
+
+
+@pytest.fixture
+def fake_resp():
+    """
+    Factory for lightweight HTTP response stand-ins
+    
+    Plain attributes instead of a Mock: status_code, text, json() returning
+    the given payload, content/raw holding its encoded bytes for orjson and
+    streaming parsers, and raise_for_status() raising `raises` if set.
+    """
+    def make(status=200, json=None, raises=None, text=''):
+        payload = {} if json is None else json
+        content = _json.dumps(payload).encode()
+        return SimpleNamespace(
+            status_code=status,
+            text=text,
+            content=content,
+            json=lambda: payload,
+            raw=io.BytesIO(content),
+            close=lambda: None,
+            raise_for_status=(lambda: _raise(raises)) if raises else (lambda: None),
+        )
+    return make
+
+
+@pytest.fixture(autouse=True)
+def _stdlib_json_decoding(monkeypatch):
+    """Decode responses with json() so Mock-built responses work whether or not ijson/orjson are installed"""
+    monkeypatch.setattr('src.scrapers.semantic_scholar_scraper.ijson', None)
+    monkeypatch.setattr('src.scrapers.semantic_scholar_scraper.orjson', None)
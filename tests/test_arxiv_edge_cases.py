@@ -1,10 +1,6 @@
 """Additional tests for arxiv scraper specific coverage"""
 import pytest
 from unittest.mock import Mock, patch, MagicMock
-import sys
-
-# Mock arxiv before importing scraper
-sys.modules['arxiv'] = Mock()
 
 from src.scrapers.arxiv_scraper import ArxivScraper
 from src.utils.logger import setup_logger
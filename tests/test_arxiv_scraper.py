@@ -2,10 +2,6 @@
 import pytest
 from unittest.mock import Mock, patch
 from datetime import datetime
-import sys
-
-# Mock arxiv module to avoid Python version issues
-sys.modules['arxiv'] = Mock()
 
 from src.scrapers.arxiv_scraper import ArxivScraper
 from src.utils.logger import setup_logger
@@ -1,12 +1,12 @@
 """Tests for Azure OpenAI summarizer"""
 import pytest
-from unittest.mock import Mock, patch, MagicMock
-import sys
+from unittest.mock import Mock, patch, MagicMock, AsyncMock
+import asyncio
+import json
 
-# Mock the openai module before importing
-sys.modules['openai'] = Mock()
-
-from src.processors.azure_summarizer import AzureSummarizer
+from src.processors.azure_summarizer import AzureSummarizer, PaperAnalysis
+from src.processors.response_cache import ResponseCache
+from src.config.settings import Settings
 
 
 class TestAzureSummarizer:
@@ -19,6 +19,13 @@ class TestAzureSummarizer:
         monkeypatch.setenv('AZURE_OPENAI_API_KEY', 'test_key_12345')
         monkeypatch.setenv('AZURE_OPENAI_DEPLOYMENT_NAME', 'gpt-4')
         monkeypatch.setenv('AZURE_OPENAI_API_VERSION', '2024-02-15-preview')
+        # Settings reads the environment at import time
+        monkeypatch.setattr(Settings, 'AZURE_OPENAI_ENDPOINT', 'https://test.openai.azure.com/')
+        monkeypatch.setattr(Settings, 'AZURE_OPENAI_API_KEY', 'test_key_12345')
+        monkeypatch.setattr(Settings, 'AZURE_OPENAI_DEPLOYMENT_NAME', 'gpt-4')
+        monkeypatch.setattr(Settings, 'AZURE_OPENAI_API_VERSION', '2024-02-15-preview')
+        # Disable the on-disk response cache so tests never share responses
+        monkeypatch.setattr(Settings, 'LLM_CACHE_PATH', '')
     
     @pytest.fixture
     def sample_paper(self):
@@ -161,6 +168,184 @@ class TestAzureSummarizer:
         
         assert insights is None
     
+    @patch('src.processors.azure_summarizer.AsyncAzureOpenAI')
+    @patch('src.processors.azure_summarizer.AzureOpenAI')
+    def test_agenerate_summary_and_insights_success(self, mock_client, mock_async_client, mock_env, sample_paper):
+        """Test async combined generation uses the async client"""
+        mock_response = Mock()
+        mock_response.choices = [Mock()]
+        mock_response.choices[0].message.content = json.dumps({
+            'summary_zh': '异步摘要',
+            'insights': '异步洞察'
+        })
+        
+        mock_async_instance = Mock()
+        mock_async_instance.chat.completions.create = AsyncMock(return_value=mock_response)
+        mock_async_client.return_value = mock_async_instance
+        
+        summarizer = AzureSummarizer()
+        analysis = asyncio.run(summarizer.agenerate_summary_and_insights(sample_paper))
+        
+        assert analysis.summary_zh == '异步摘要'
+        assert analysis.insights == '异步洞察'
+        mock_async_instance.chat.completions.create.assert_awaited_once()
+        mock_client.return_value.chat.completions.create.assert_not_called()
+    
+    @patch('src.processors.azure_summarizer.AsyncAzureOpenAI')
+    @patch('src.processors.azure_summarizer.AzureOpenAI')
+    def test_agenerate_summary_and_insights_error_handling(self, mock_client, mock_async_client, mock_env, sample_paper):
+        """Test async combined generation error handling"""
+        mock_async_instance = Mock()
+        mock_async_instance.chat.completions.create = AsyncMock(side_effect=Exception("API Error"))
+        mock_async_client.return_value = mock_async_instance
+        
+        summarizer = AzureSummarizer()
+        analysis = asyncio.run(summarizer.agenerate_summary_and_insights(sample_paper))
+        
+        assert analysis is None
+    
+    @patch('src.processors.azure_summarizer.AzureOpenAI')
+    def test_generate_summary_and_insights_single_call(self, mock_client, mock_env, sample_paper):
+        """Test combined generation parses JSON from one request"""
+        mock_response = Mock()
+        mock_response.choices = [Mock()]
+        mock_response.choices[0].message.content = json.dumps({
+            'summary_zh': '摘要',
+            'insights': '洞察',
+            'keywords': ['AI', 'ML']
+        })
+        
+        mock_instance = Mock()
+        mock_instance.chat.completions.create.return_value = mock_response
+        mock_client.return_value = mock_instance
+        
+        summarizer = AzureSummarizer()
+        analysis = summarizer.generate_summary_and_insights(sample_paper)
+        
+        assert analysis == PaperAnalysis(summary_zh='摘要', insights='洞察', keywords='AI, ML')
+        assert mock_instance.chat.completions.create.call_count == 1
+        _, kwargs = mock_instance.chat.completions.create.call_args
+        assert kwargs['response_format'] == {"type": "json_object"}
+        assert 'Test Paper on Machine Learning' in kwargs['messages'][1]['content']
+    
+    @patch('src.processors.azure_summarizer.AzureOpenAI')
+    def test_generate_summary_and_insights_invalid_json(self, mock_client, mock_env, sample_paper):
+        """Test combined generation returns None on malformed JSON"""
+        mock_response = Mock()
+        mock_response.choices = [Mock()]
+        mock_response.choices[0].message.content = 'not json'
+        
+        mock_instance = Mock()
+        mock_instance.chat.completions.create.return_value = mock_response
+        mock_client.return_value = mock_instance
+        
+        summarizer = AzureSummarizer()
+        
+        assert summarizer.generate_summary_and_insights(sample_paper) is None
+    
+    @patch('src.processors.azure_summarizer.AzureOpenAI')
+    def test_cache_hit_skips_api_call(self, mock_client, mock_env, sample_paper):
+        """Test a repeated prompt is served from the response cache"""
+        mock_response = Mock()
+        mock_response.choices = [Mock()]
+        mock_response.choices[0].message.content = '缓存摘要'
+        
+        mock_instance = Mock()
+        mock_instance.chat.completions.create.return_value = mock_response
+        mock_client.return_value = mock_instance
+        
+        summarizer = AzureSummarizer(cache=ResponseCache(':memory:'))
+        first = summarizer.generate_summary(sample_paper)
+        second = summarizer.generate_summary(sample_paper)
+        
+        assert first == second == '缓存摘要'
+        assert mock_instance.chat.completions.create.call_count == 1
+    
+    @patch('src.processors.azure_summarizer.AzureOpenAI')
+    def test_cache_skips_unparseable_response(self, mock_client, mock_env, sample_paper):
+        """Test malformed JSON is not cached so a retry calls the API again"""
+        mock_response = Mock()
+        mock_response.choices = [Mock()]
+        mock_response.choices[0].message.content = 'not json'
+        
+        mock_instance = Mock()
+        mock_instance.chat.completions.create.return_value = mock_response
+        mock_client.return_value = mock_instance
+        
+        summarizer = AzureSummarizer(cache=ResponseCache(':memory:'))
+        summarizer.generate_summary_and_insights(sample_paper)
+        summarizer.generate_summary_and_insights(sample_paper)
+        
+        assert mock_instance.chat.completions.create.call_count == 2
+    
+    @patch('src.processors.azure_summarizer.AzureOpenAI')
+    def test_cache_skips_response_without_insights(self, mock_client, mock_env, sample_paper):
+        """Test a reply missing insights is not cached so the next run regenerates it"""
+        mock_response = Mock()
+        mock_response.choices = [Mock()]
+        mock_response.choices[0].message.content = json.dumps({'summary_zh': '摘要'})
+        
+        mock_instance = Mock()
+        mock_instance.chat.completions.create.return_value = mock_response
+        mock_client.return_value = mock_instance
+        
+        summarizer = AzureSummarizer(cache=ResponseCache(':memory:'))
+        first = summarizer.generate_summary_and_insights(sample_paper)
+        summarizer.generate_summary_and_insights(sample_paper)
+        
+        assert first.summary_zh == '摘要'
+        assert first.insights is None
+        assert mock_instance.chat.completions.create.call_count == 2
+    
+    @staticmethod
+    def _completion(content, finish_reason='stop'):
+        """Build a chat completion response with a single choice"""
+        response = Mock()
+        response.choices = [Mock(finish_reason=finish_reason)]
+        response.choices[0].message.content = content
+        return response
+    
+    @patch('src.processors.azure_summarizer.AzureOpenAI')
+    def test_truncated_combined_response_falls_back(self, mock_client, mock_env, sample_paper):
+        """Test a combined reply cut off at max_tokens is redone as separate calls and not cached"""
+        mock_instance = Mock()
+        mock_instance.chat.completions.create.side_effect = [
+            self._completion('{"summary_zh": "很长的摘要', finish_reason='length'),
+            self._completion('完整摘要'),
+            self._completion('投资洞察'),
+        ]
+        mock_client.return_value = mock_instance
+        
+        summarizer = AzureSummarizer(cache=ResponseCache(':memory:'))
+        analysis = summarizer.generate_summary_and_insights(sample_paper)
+        
+        assert analysis.summary_zh == '完整摘要'
+        assert analysis.insights == '投资洞察'
+        budgets = [c.kwargs['max_tokens'] for c in mock_instance.chat.completions.create.call_args_list]
+        assert budgets == [5700, 4500, 1200]
+        combined_key = summarizer._cache_key(summarizer._build_combined_messages(sample_paper))
+        assert summarizer.cache.get(combined_key) is None
+    
+    @patch('src.processors.azure_summarizer.AsyncAzureOpenAI')
+    @patch('src.processors.azure_summarizer.AzureOpenAI')
+    def test_agenerate_truncated_combined_response_falls_back(self, mock_client, mock_async_client,
+                                                              mock_env, sample_paper):
+        """Test the async path also falls back to separate calls on a truncated reply"""
+        mock_async_instance = Mock()
+        mock_async_instance.chat.completions.create = AsyncMock(
+            return_value=self._completion('{"summary_zh": "很长的摘要', finish_reason='length')
+        )
+        mock_async_client.return_value = mock_async_instance
+        mock_client.return_value.chat.completions.create.side_effect = [
+            self._completion('完整摘要'),
+            self._completion('投资洞察'),
+        ]
+        
+        summarizer = AzureSummarizer()
+        analysis = asyncio.run(summarizer.agenerate_summary_and_insights(sample_paper))
+        
+        assert analysis == PaperAnalysis(summary_zh='完整摘要', insights='投资洞察')
+    
     @patch('src.processors.azure_summarizer.AzureOpenAI')
     def test_build_summary_prompt(self, mock_client, mock_env, sample_paper):
         """Test summary prompt building"""
@@ -0,0 +1,28 @@
+"""Tests for the Bloom filter utility"""
+import pytest
+from src.utils.bloom_filter import BloomFilter
+
+
+class TestBloomFilter:
+    """Test BloomFilter class"""
+    
+    def test_added_items_are_members(self):
+        """Test there are no false negatives"""
+        bloom = BloomFilter(capacity=1000)
+        items = [f'paper-{i}' for i in range(1000)]
+        bloom.update(items)
+        
+        assert all(item in bloom for item in items)
+    
+    def test_false_positive_rate_near_target(self):
+        """Test unseen items rarely hit at capacity"""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        bloom.update(f'paper-{i}' for i in range(1000))
+        
+        hits = sum(f'other-{i}' in bloom for i in range(10000))
+        assert hits < 300  # ~1% expected
+    
+    def test_empty_filter(self):
+        """Test an empty filter contains nothing"""
+        bloom = BloomFilter(capacity=10)
+        assert 'anything' not in bloom
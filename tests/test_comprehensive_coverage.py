@@ -1,16 +1,10 @@
 """Additional comprehensive tests to reach 99% coverage"""
 import pytest
 from unittest.mock import Mock, patch, MagicMock
-import sys
 from datetime import datetime, timedelta
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
-# Mock dependencies
-sys.modules['arxiv'] = Mock()
-sys.modules['scholarly'] = Mock()
-sys.modules['openai'] = Mock()
-
 from src.database.models import Paper, get_session, Base
 from src.scrapers.base_scraper import BaseScraper
 
@@ -104,7 +104,7 @@ class TestDailySchedulerMissingLines:
 class TestSemanticScholarMissingLines:
     """Tests for missing lines in semantic_scholar_scraper.py"""
     
-    @patch('src.scrapers.semantic_scholar_scraper.requests.get')
+    @patch('src.scrapers.semantic_scholar_scraper.requests.Session.get')
     def test_search_with_exception(self, mock_get):
         """Test search with exception (lines 85-86)"""
         from src.scrapers.semantic_scholar_scraper import SemanticScholarScraper
@@ -120,7 +120,7 @@ class TestSemanticScholarMissingLines:
         
         assert results == []
     
-    @patch('src.scrapers.semantic_scholar_scraper.requests.get')
+    @patch('src.scrapers.semantic_scholar_scraper.requests.Session.get')
     def test_get_paper_by_arxiv_id_404(self, mock_get):
         """Test get_paper_by_arxiv_id with 404 (lines 117-118)"""
         from src.scrapers.semantic_scholar_scraper import SemanticScholarScraper
@@ -137,8 +137,8 @@ class TestSemanticScholarMissingLines:
         
         assert result is None
     
-    @patch('src.scrapers.semantic_scholar_scraper.requests.get')
-    def test_enrich_papers_max_limit(self, mock_get):
+    @patch('src.scrapers.semantic_scholar_scraper.requests.Session.post')
+    def test_enrich_papers_max_limit(self, mock_post):
         """Test enrich_papers respects max_papers limit (lines 178-181)"""
         from src.scrapers.semantic_scholar_scraper import SemanticScholarScraper
         from src.utils.logger import setup_logger
@@ -154,19 +154,15 @@ class TestSemanticScholarMissingLines:
         
         mock_response = Mock()
         mock_response.status_code = 200
-        mock_response.json.return_value = {
-            'paperId': 'test',
-            'title': 'Test',
-            'citationCount': 10
-        }
-        mock_get.return_value = mock_response
+        mock_response.json.return_value = [{'paperId': 'test', 'citationCount': 10}] * 10
+        mock_post.return_value = mock_response
         
         enriched = scraper.enrich_papers_with_citations(papers, max_papers=10)
         
         # Should process only 10 papers
-        assert mock_get.call_count <= 10
+        assert len(mock_post.call_args.kwargs['json']['ids']) == 10
     
-    @patch('src.scrapers.semantic_scholar_scraper.requests.get')
+    @patch('src.scrapers.semantic_scholar_scraper.requests.Session.get')
     def test_get_recent_papers_with_error(self, mock_get):
         """Test get_recent_papers with API error (lines 212-214)"""
         from src.scrapers.semantic_scholar_scraper import SemanticScholarScraper
@@ -184,7 +180,7 @@ class TestSemanticScholarMissingLines:
         
         assert results == []
     
-    @patch('src.scrapers.semantic_scholar_scraper.requests.get')
+    @patch('src.scrapers.semantic_scholar_scraper.requests.Session.get')
     def test_normalize_with_missing_external_ids(self, mock_get):
         """Test _normalize_paper without externalIds field (lines 255-258)"""
         from src.scrapers.semantic_scholar_scraper import SemanticScholarScraper
@@ -314,7 +310,7 @@ class TestEdgeCasesForFullCoverage:
         except Exception:
             pass  # Expected
     
-    @patch('src.scrapers.semantic_scholar_scraper.requests.get')
+    @patch('src.scrapers.semantic_scholar_scraper.requests.Session.get')
     def test_semantic_scholar_with_fields_of_study(self, mock_get):
         """Test search with fields_of_study parameter (lines 63-64)"""
         from src.scrapers.semantic_scholar_scraper import SemanticScholarScraper
@@ -338,7 +334,7 @@ class TestEdgeCasesForFullCoverage:
         call_kwargs = mock_get.call_args[1]
         assert 'fieldsOfStudy' in call_kwargs['params']
     
-    @patch('src.scrapers.semantic_scholar_scraper.requests.get')
+    @patch('src.scrapers.semantic_scholar_scraper.requests.Session.get')
     def test_semantic_scholar_with_year_filter(self, mock_get):
         """Test search with year_filter parameter (lines 61-62)"""
         from src.scrapers.semantic_scholar_scraper import SemanticScholarScraper
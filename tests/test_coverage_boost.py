@@ -220,7 +220,7 @@ class TestScholarScraperCoverage:
 class TestSemanticScholarScraperCoverage:
     """Tests for uncovered lines in semantic_scholar_scraper.py"""
     
-    @patch('src.scrapers.semantic_scholar_scraper.requests.get')
+    @patch('src.scrapers.semantic_scholar_scraper.requests.Session.get')
     def test_search_with_rate_limit(self, mock_get):
         """Test search with 429 rate limit returns empty"""
         from src.scrapers.semantic_scholar_scraper import SemanticScholarScraper
@@ -242,7 +242,7 @@ class TestSemanticScholarScraperCoverage:
         assert results == []
         assert mock_get.call_count == 1
     
-    @patch('src.scrapers.semantic_scholar_scraper.requests.get')
+    @patch('src.scrapers.semantic_scholar_scraper.requests.Session.get')
     def test_normalize_without_external_ids(self, mock_get):
         """Test normalizing paper without external IDs"""
         from src.scrapers.semantic_scholar_scraper import SemanticScholarScraper
@@ -266,7 +266,7 @@ class TestSemanticScholarScraperCoverage:
         assert normalized['paper_id'] == 'abc123'
         assert normalized['doi'] == ''
     
-    @patch('src.scrapers.semantic_scholar_scraper.requests.get')
+    @patch('src.scrapers.semantic_scholar_scraper.requests.Session.get')
     def test_get_recent_papers_success(self, mock_get):
         """Test get_recent_papers"""
         from src.scrapers.semantic_scholar_scraper import SemanticScholarScraper
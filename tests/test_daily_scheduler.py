@@ -2,16 +2,6 @@
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 from datetime import datetime
-import sys
-
-# Mock dependencies
-sys.modules['arxiv'] = Mock()
-sys.modules['scholarly'] = Mock()
-sys.modules['apscheduler'] = Mock()
-sys.modules['apscheduler.schedulers'] = Mock()
-sys.modules['apscheduler.schedulers.blocking'] = Mock()
-sys.modules['apscheduler.triggers'] = Mock()
-sys.modules['apscheduler.triggers.cron'] = Mock()
 
 
 class TestDailySchedulerImports:
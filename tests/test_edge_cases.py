@@ -1,15 +1,9 @@
 """Edge case tests to increase coverage"""
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock, patch, MagicMock, AsyncMock
 from datetime import datetime, timedelta
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-import sys
-
-# Mock dependencies
-sys.modules['arxiv'] = Mock()
-sys.modules['scholarly'] = Mock()
-sys.modules['openai'] = Mock()
 
 from src.database.models import Base, Paper
 from src.database.repository import PaperRepository
@@ -92,7 +86,7 @@ class TestRepositoryEdgeCases:
 class TestScraperEdgeCases:
     """Test scraper edge cases"""
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_semantic_scholar_network_error(self, mock_get):
         """Test handling network errors"""
         from src.scrapers.semantic_scholar_scraper import SemanticScholarScraper
@@ -106,7 +100,7 @@ class TestScraperEdgeCases:
         results = scraper.search('test query')
         assert len(results) == 0
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_semantic_scholar_invalid_json(self, mock_get):
         """Test handling invalid JSON response"""
         from src.scrapers.semantic_scholar_scraper import SemanticScholarScraper
@@ -161,7 +155,6 @@ class TestSchedulerEdgeCases:
         mock_ss.return_value = mock_ss_instance
         
         scheduler = DailyPaperScheduler()
-        scheduler.ss_scraper = mock_ss_instance
         
         # Should handle exception gracefully
         try:
@@ -188,8 +181,6 @@ class TestSchedulerEdgeCases:
         mock_ss.return_value = mock_ss_instance
         
         scheduler = DailyPaperScheduler()
-        scheduler.paper_repo = mock_repo_instance
-        scheduler.ss_scraper = mock_ss_instance
         
         result = scheduler.fetch_and_store_papers()
         
@@ -220,14 +211,14 @@ class TestProcessorEdgeCases:
         mock_repo.return_value = mock_repo_instance
         
         mock_summarizer_instance = Mock()
-        mock_summarizer_instance.generate_summary.side_effect = Exception("API Error")
+        mock_summarizer_instance.agenerate_summary_and_insights = AsyncMock(side_effect=Exception("API Error"))
         mock_summarizer.return_value = mock_summarizer_instance
         
         processor = PaperProcessor()
         processor.process_unprocessed_papers(limit=1)
         
         # Should handle exception and not update database
-        mock_repo_instance.update_summary.assert_not_called()
+        mock_repo_instance.bulk_update_summaries.assert_not_called()
 
 
 class TestModelEdgeCases:
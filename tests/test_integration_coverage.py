@@ -1,22 +1,13 @@
 """Integration-style tests to increase coverage by running actual code paths"""
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import DEFAULT, Mock, patch, MagicMock
 import sys
 import os
+from contextlib import suppress
 import tempfile
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
-# Mock dependencies
-sys.modules['arxiv'] = Mock()
-sys.modules['scholarly'] = Mock()
-sys.modules['openai'] = Mock()
-sys.modules['apscheduler'] = Mock()
-sys.modules['apscheduler.schedulers'] = Mock()
-sys.modules['apscheduler.schedulers.background'] = Mock()
-sys.modules['apscheduler.triggers'] = Mock()
-sys.modules['apscheduler.triggers.cron'] = Mock()
-
 from src.database.models import Base, Paper
 from src.database.repository import PaperRepository
 
@@ -108,7 +99,7 @@ class TestRealDatabaseIntegration:
 class TestScraperRealCalls:
     """Test scrapers with minimal mocking to cover error paths"""
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_semantic_scholar_real_api_flow(self, mock_get):
         """Test semantic scholar with realistic API responses"""
         from src.scrapers.semantic_scholar_scraper import SemanticScholarScraper
@@ -204,37 +195,38 @@ class TestScraperRealCalls:
 class TestSchedulerRealExecution:
     """Test scheduler with realistic execution"""
     
-    @patch('src.scheduler.daily_scheduler.init_database')
-    @patch('src.scheduler.daily_scheduler.PaperRepository')
-    @patch('src.scheduler.daily_scheduler.SemanticScholarScraper')
-    @patch('src.scheduler.daily_scheduler.ArxivScraper')
-    @patch('src.scheduler.daily_scheduler.BackgroundScheduler')
-    @patch('src.scheduler.daily_scheduler.CronTrigger')
-    def test_scheduler_main_with_time_args(self, mock_cron, mock_bg_scheduler, mock_arxiv, mock_ss, mock_repo, mock_init):
+    @patch.multiple(
+        'src.scheduler.daily_scheduler',
+        init_database=DEFAULT,
+        PaperRepository=DEFAULT,
+        SemanticScholarScraper=DEFAULT,
+        OpenAlexScraper=DEFAULT,
+        BlockingScheduler=DEFAULT,
+        CronTrigger=DEFAULT,
+    )
+    def test_scheduler_main_with_time_args(self, **mocks):
         """Test main() with time arguments to cover lines 183"""
         from src.scheduler.daily_scheduler import main
         
         mock_scheduler_instance = Mock()
-        mock_bg_scheduler.return_value = mock_scheduler_instance
+        mocks['BlockingScheduler'].return_value = mock_scheduler_instance
         mock_scheduler_instance.start.side_effect = KeyboardInterrupt()
         
         mock_repo_instance = Mock()
         mock_repo_instance.count_all.return_value = 0
         mock_repo_instance.count_unprocessed.return_value = 0
-        mock_repo.return_value = mock_repo_instance
+        mock_repo_instance.deduplicate.return_value = {'removed_by_paper_id': 0, 'removed_by_title': 0}
+        mocks['PaperRepository'].return_value = mock_repo_instance
         
-        mock_ss_instance = Mock()
-        mock_ss_instance.get_recent_papers.return_value = []
-        mock_ss.return_value = mock_ss_instance
+        mocks['SemanticScholarScraper'].return_value.get_recent_papers.return_value = []
+        mocks['OpenAlexScraper'].return_value.get_recent_papers.return_value = []
         
-        with patch('sys.argv', ['daily_scheduler.py', '--time', '15:30', '--timezone', 'UTC']):
-            try:
-                main()
-            except:
-                pass
+        with patch('sys.argv', ['daily_scheduler.py', '--time', '15:30', '--timezone', 'UTC']), \
+                suppress(KeyboardInterrupt, SystemExit, RuntimeError):
+            main()
         
         # Verify CronTrigger was called with correct params (lines 119-147)
-        mock_cron.assert_called()
+        mocks['CronTrigger'].assert_called()
         
         # Verify scheduler was started (line 140)
         mock_scheduler_instance.start.assert_called()
@@ -76,3 +76,35 @@ class TestLogger:
             
             expected_level = getattr(logging, level)
             assert logger.level == expected_level
+    
+    def test_setup_logger_routes_each_name_to_its_file(self, tmp_path, monkeypatch):
+        """Test reconfiguring one name does not redirect another name's output"""
+        from src.config.settings import Settings
+        monkeypatch.setattr(Settings, 'LOG_DIR', tmp_path)
+        
+        first = setup_logger("route_a")
+        second = setup_logger("route_b")
+        again = setup_logger("route_a")
+        first.info("from a")
+        second.info("from b")
+        again.info("from a again")
+        
+        a_log = (tmp_path / "route_a.log").read_text()
+        b_log = (tmp_path / "route_b.log").read_text()
+        assert "from a" in a_log and "from a again" in a_log
+        assert "from b" not in a_log
+        assert "from b" in b_log and "from a" not in b_log
+    
+    def test_setup_logger_follows_log_dir_changes(self, tmp_path, monkeypatch):
+        """Test a changed LOG_DIR is picked up on the next call"""
+        from src.config.settings import Settings
+        monkeypatch.setattr(Settings, 'LOG_DIR', tmp_path / "old")
+        (tmp_path / "old").mkdir()
+        setup_logger("moving")
+        
+        monkeypatch.setattr(Settings, 'LOG_DIR', tmp_path / "new")
+        (tmp_path / "new").mkdir()
+        setup_logger("moving").info("after move")
+        
+        assert "after move" in (tmp_path / "new" / "moving.log").read_text()
+        assert not (tmp_path / "old" / "moving.log").read_text()
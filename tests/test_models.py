@@ -171,3 +171,25 @@ class TestDatabaseFunctions:
         tables = inspector.get_table_names()
         
         assert 'papers' in tables
+    
+    def test_init_database_backfills_fulltext_index(self, tmp_path):
+        """Test init_database adds and fills the FTS table on an existing database"""
+        from sqlalchemy import text
+        
+        db_url = f"sqlite:///{tmp_path / 'test_fts.db'}"
+        engine = create_engine(db_url)
+        Base.metadata.create_all(engine)
+        with engine.begin() as connection:
+            # Simulate a database created before the FTS index existed
+            for trigger in ('papers_fts_ai', 'papers_fts_ad', 'papers_fts_au'):
+                connection.execute(text(f"DROP TRIGGER {trigger}"))
+            connection.execute(text("DROP TABLE paper_fts"))
+            connection.execute(text("INSERT INTO papers (title, paper_id) VALUES ('Graph Neural Networks', 'gnn1')"))
+        
+        engine = init_database(db_url)
+        
+        with engine.connect() as connection:
+            rows = connection.execute(
+                text("SELECT rowid FROM paper_fts WHERE paper_fts MATCH 'graph'")
+            ).fetchall()
+        assert len(rows) == 1
@@ -1,10 +1,6 @@
 """Tests for paper processor"""
 import pytest
 from unittest.mock import Mock, patch, MagicMock
-import sys
-
-# Mock openai module
-sys.modules['openai'] = Mock()
 
 from src.database.models import Paper
 from src.database.repository import PaperRepository
@@ -67,7 +63,7 @@ class TestProcessPapers:
             insights='投资洞察'
         )
         
-        mock_repo_instance.update_summary.assert_called_once()
-        call_args = mock_repo_instance.update_summary.call_args
-        assert call_args[0][0] == 'test123'
-        assert call_args[1]['summary_zh'] == '中文摘要'
+        assert mock_repo_instance.update_summary.call_count == 1
+        args, kwargs = mock_repo_instance.update_summary.call_args
+        assert args[0] == 'test123'
+        assert kwargs['summary_zh'] == '中文摘要'
@@ -1,15 +1,15 @@
 """Comprehensive tests for process_papers module"""
 import pytest
-from unittest.mock import Mock, patch, MagicMock
-import sys
+from unittest.mock import Mock, patch, MagicMock, AsyncMock
+import json
 
-# Mock openai
-sys.modules['openai'] = Mock()
+from src.processors.azure_summarizer import AzureSummarizer, PaperAnalysis
+from src.scheduler.process_papers import PaperProcessor, main
 
 
-@pytest.fixture
-def mock_dependencies():
-    """Mock dependencies for process_papers"""
+@pytest.fixture(scope="module")
+def _patched_dependencies():
+    """Patch process_papers dependencies once for the whole module"""
     with patch('src.scheduler.process_papers.PaperRepository') as mock_repo, \
          patch('src.scheduler.process_papers.AzureSummarizer') as mock_summarizer:
         yield {
@@ -18,12 +18,19 @@ def mock_dependencies():
         }
 
 
+@pytest.fixture
+def mock_dependencies(_patched_dependencies):
+    """Mock dependencies for process_papers, reset before each test"""
+    for mock in _patched_dependencies.values():
+        mock.reset_mock(return_value=True, side_effect=True)
+    return _patched_dependencies
+
+
 class TestPaperProcessor:
     """Test PaperProcessor class"""
     
     def test_initialization(self, mock_dependencies):
         """Test processor initialization"""
-        from src.scheduler.process_papers import PaperProcessor
         
         mock_dependencies['repo'].return_value = Mock()
         mock_dependencies['summarizer'].return_value = Mock()
@@ -36,7 +43,6 @@ class TestPaperProcessor:
     
     def test_process_unprocessed_papers_success(self, mock_dependencies):
         """Test successful processing of unprocessed papers"""
-        from src.scheduler.process_papers import PaperProcessor
         
         # Create mock paper
         mock_paper = Mock()
@@ -47,30 +53,34 @@ class TestPaperProcessor:
         mock_paper.citation_count = 50
         mock_paper.venue = 'Conference'
         mock_paper.paper_id = 'test123'
+        mock_paper.id = 1
         
         mock_repo = Mock()
         mock_repo.get_unprocessed.return_value = [mock_paper]
-        mock_repo.update_summary = Mock()
         mock_dependencies['repo'].return_value = mock_repo
         
         mock_summarizer = Mock()
-        mock_summarizer.generate_summary.return_value = '中文摘要'
-        mock_summarizer.generate_investment_insights.return_value = '投资洞察'
+        mock_summarizer.agenerate_summary_and_insights = AsyncMock(
+            return_value=PaperAnalysis(summary_zh='中文摘要', insights='投资洞察', keywords='AI, ML')
+        )
         mock_dependencies['summarizer'].return_value = mock_summarizer
         
         processor = PaperProcessor()
         processor.process_unprocessed_papers(limit=1)
         
-        # Should have generated summary
-        mock_summarizer.generate_summary.assert_called_once()
-        # Should have generated insights
-        mock_summarizer.generate_investment_insights.assert_called_once()
-        # Should have updated database
-        mock_repo.update_summary.assert_called_once()
+        # Should have generated summary and insights in a single call
+        mock_summarizer.agenerate_summary_and_insights.assert_awaited_once()
+        # Should have updated database with both fields in one bulk write
+        mock_repo.bulk_update_summaries.assert_called_once_with([{
+            'id': 1,
+            'summary_zh': '中文摘要',
+            'keywords': 'AI, ML',
+            'investment_insights': '投资洞察',
+            'processed': True
+        }])
     
     def test_process_no_unprocessed_papers(self, mock_dependencies):
         """Test processing when no unprocessed papers"""
-        from src.scheduler.process_papers import PaperProcessor
         
         mock_repo = Mock()
         mock_repo.get_unprocessed.return_value = []
@@ -83,11 +93,21 @@ class TestPaperProcessor:
         processor.process_unprocessed_papers()
         
         # Should not call summarizer
-        mock_summarizer.generate_summary.assert_not_called()
+        mock_summarizer.agenerate_summary_and_insights.assert_not_called()
+    
+    def test_pending_count_shortcircuit(self, mock_dependencies):
+        """Test an empty pending counter skips the unprocessed-queue query"""
+        mock_repo = Mock()
+        mock_repo.pending_count.return_value = 0
+        mock_dependencies['repo'].return_value = mock_repo
+        
+        processor = PaperProcessor()
+        processor.process_unprocessed_papers()
+        
+        mock_repo.get_unprocessed.assert_not_called()
     
     def test_process_summary_generation_failed(self, mock_dependencies):
         """Test when summary generation fails"""
-        from src.scheduler.process_papers import PaperProcessor
         
         mock_paper = Mock()
         mock_paper.title = 'Test'
@@ -103,18 +123,17 @@ class TestPaperProcessor:
         mock_dependencies['repo'].return_value = mock_repo
         
         mock_summarizer = Mock()
-        mock_summarizer.generate_summary.return_value = None  # Failed
+        mock_summarizer.agenerate_summary_and_insights = AsyncMock(return_value=None)  # Failed
         mock_dependencies['summarizer'].return_value = mock_summarizer
         
         processor = PaperProcessor()
         processor.process_unprocessed_papers(limit=1)
         
         # Should not update database if summary failed
-        mock_repo.update_summary.assert_not_called()
+        mock_repo.bulk_update_summaries.assert_not_called()
     
     def test_process_insights_generation_failed(self, mock_dependencies):
         """Test when insights generation fails"""
-        from src.scheduler.process_papers import PaperProcessor
         
         mock_paper = Mock()
         mock_paper.title = 'Test'
@@ -130,19 +149,88 @@ class TestPaperProcessor:
         mock_dependencies['repo'].return_value = mock_repo
         
         mock_summarizer = Mock()
-        mock_summarizer.generate_summary.return_value = '摘要'
-        mock_summarizer.generate_investment_insights.return_value = None  # Failed
+        mock_summarizer.agenerate_summary_and_insights = AsyncMock(
+            return_value=PaperAnalysis(summary_zh='摘要', insights=None)  # Insights failed
+        )
         mock_dependencies['summarizer'].return_value = mock_summarizer
         
         processor = PaperProcessor()
         processor.process_unprocessed_papers(limit=1)
         
-        # Should not update database if insights failed
-        mock_repo.update_summary.assert_not_called()
+        # The summary is still saved and the paper marked processed
+        mock_repo.bulk_update_summaries.assert_called_once()
+        update, = mock_repo.bulk_update_summaries.call_args[0][0]
+        assert update['summary_zh'] == '摘要'
+        assert update['investment_insights'] is None
+        assert update['processed'] is True
+    
+    def test_process_batch_respects_concurrency_limit(self, mock_dependencies):
+        """Test papers are processed concurrently up to the limit"""
+        import asyncio
+        
+        papers = []
+        for i in range(6):
+            mock_paper = Mock()
+            mock_paper.title = f'Paper {i}'
+            mock_paper.paper_id = f'test{i}'
+            papers.append(mock_paper)
+        
+        mock_repo = Mock()
+        mock_repo.get_unprocessed.return_value = papers
+        mock_dependencies['repo'].return_value = mock_repo
+        
+        in_flight = 0
+        peak = 0
+        
+        async def fake_analysis(paper_dict):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return PaperAnalysis(summary_zh='摘要', insights='洞察')
+        
+        mock_summarizer = Mock()
+        mock_summarizer.agenerate_summary_and_insights = AsyncMock(side_effect=fake_analysis)
+        mock_dependencies['summarizer'].return_value = mock_summarizer
+        
+        processor = PaperProcessor(concurrency_limit=2)
+        processor.process_unprocessed_papers()
+        
+        assert peak == 2
+        assert mock_repo.bulk_update_summaries.call_count == 1
+        (updates,), _ = mock_repo.bulk_update_summaries.call_args
+        assert len(updates) == 6
+    
+    def test_process_writes_updates_in_chunks(self, mock_dependencies):
+        """Test bulk updates are split by BULK_UPDATE_CHUNK_SIZE"""
+        
+        papers = []
+        for i in range(5):
+            mock_paper = Mock()
+            mock_paper.title = f'Paper {i}'
+            mock_paper.id = i
+            papers.append(mock_paper)
+        
+        mock_repo = Mock()
+        mock_repo.get_unprocessed.return_value = papers
+        mock_dependencies['repo'].return_value = mock_repo
+        
+        mock_summarizer = Mock()
+        mock_summarizer.agenerate_summary_and_insights = AsyncMock(
+            return_value=PaperAnalysis(summary_zh='摘要', insights='洞察')
+        )
+        mock_dependencies['summarizer'].return_value = mock_summarizer
+        
+        processor = PaperProcessor()
+        processor.BULK_UPDATE_CHUNK_SIZE = 2
+        processor.process_unprocessed_papers()
+        
+        chunk_sizes = [len(c[0][0]) for c in mock_repo.bulk_update_summaries.call_args_list]
+        assert chunk_sizes == [2, 2, 1]
     
     def test_process_with_limit(self, mock_dependencies):
         """Test processing with limit"""
-        from src.scheduler.process_papers import PaperProcessor
         
         mock_paper = Mock()
         mock_paper.title = 'Test'
@@ -164,6 +252,121 @@ class TestPaperProcessor:
         mock_repo.return_value.get_unprocessed.assert_called_with(limit=5)
 
 
+class TestBatchMode:
+    """Test Batch API processing path"""
+    
+    @staticmethod
+    def _make_papers(count):
+        papers = []
+        for i in range(count):
+            mock_paper = Mock()
+            mock_paper.title = f'Paper {i}'
+            mock_paper.paper_id = f'p{i}'
+            mock_paper.id = i
+            mock_paper.keywords = None
+            papers.append(mock_paper)
+        return papers
+    
+    @staticmethod
+    def _batch_output(paper_ids, status_code=200):
+        lines = []
+        for paper_id in paper_ids:
+            content = json.dumps({'summary_zh': f'摘要 {paper_id}', 'insights': '洞察', 'keywords': 'AI'})
+            lines.append(json.dumps({
+                'custom_id': paper_id,
+                'response': {
+                    'status_code': status_code,
+                    'body': {'choices': [{'message': {'content': content}}]}
+                }
+            }))
+        return '\n'.join(lines)
+    
+    @patch('src.scheduler.process_papers.time.sleep')
+    def test_process_via_batch_api(self, mock_sleep, mock_dependencies):
+        """Test batch results are applied to each paper by custom_id"""
+        
+        papers = self._make_papers(2)
+        mock_repo = Mock()
+        mock_dependencies['repo'].return_value = mock_repo
+        
+        mock_summarizer = Mock()
+        mock_summarizer.build_batch_body.return_value = {'model': 'gpt-4', 'messages': []}
+        mock_summarizer.parse_analysis.side_effect = AzureSummarizer.parse_analysis
+        client = mock_summarizer.client
+        client.files.create.return_value = Mock(id='file-in')
+        client.batches.create.return_value = Mock(id='batch-1', status='in_progress')
+        client.batches.retrieve.return_value = Mock(
+            id='batch-1', status='completed', output_file_id='file-out'
+        )
+        client.files.content.return_value = Mock(text=self._batch_output(['p0', 'p1']))
+        mock_dependencies['summarizer'].return_value = mock_summarizer
+        
+        processor = PaperProcessor()
+        processed = processor.process_via_batch_api(papers, poll_interval=0)
+        
+        assert processed == 2
+        assert client.files.create.call_args[1]['purpose'] == 'batch'
+        uploaded = client.files.create.call_args[1]['file'][1].decode('utf-8').splitlines()
+        assert [json.loads(line)['custom_id'] for line in uploaded] == ['p0', 'p1']
+        client.batches.create.assert_called_once_with(
+            input_file_id='file-in', endpoint='/chat/completions', completion_window='24h'
+        )
+        updates = mock_repo.bulk_update_summaries.call_args[0][0]
+        assert [u['id'] for u in updates] == [0, 1]
+        assert updates[1]['summary_zh'] == '摘要 p1'
+    
+    def test_failed_batch_updates_nothing(self, mock_dependencies):
+        """Test a failed batch leaves papers unprocessed"""
+        
+        mock_repo = Mock()
+        mock_dependencies['repo'].return_value = mock_repo
+        
+        mock_summarizer = Mock()
+        mock_summarizer.build_batch_body.return_value = {}
+        mock_summarizer.client.batches.create.return_value = Mock(
+            id='batch-1', status='failed', output_file_id=None
+        )
+        mock_dependencies['summarizer'].return_value = mock_summarizer
+        
+        processor = PaperProcessor()
+        
+        assert processor.process_via_batch_api(self._make_papers(3), poll_interval=0) == 0
+        mock_repo.bulk_update_summaries.assert_not_called()
+    
+    def test_large_backlog_uses_batch(self, mock_dependencies):
+        """Test use_batch routes large backlogs to the Batch API"""
+        
+        mock_repo = Mock()
+        mock_repo.get_unprocessed.return_value = self._make_papers(PaperProcessor.BATCH_API_THRESHOLD + 1)
+        mock_dependencies['repo'].return_value = mock_repo
+        
+        processor = PaperProcessor()
+        with patch.object(processor, 'process_via_batch_api') as mock_batch:
+            processor.process_unprocessed_papers(use_batch=True)
+        
+        mock_batch.assert_called_once()
+    
+    def test_small_backlog_stays_synchronous(self, mock_dependencies):
+        """Test small backlogs skip the Batch API even with use_batch"""
+        
+        mock_repo = Mock()
+        mock_repo.get_unprocessed.return_value = self._make_papers(2)
+        mock_dependencies['repo'].return_value = mock_repo
+        
+        mock_summarizer = Mock()
+        mock_summarizer.agenerate_summary_and_insights = AsyncMock(
+            return_value=PaperAnalysis(summary_zh='摘要', insights='洞察')
+        )
+        mock_dependencies['summarizer'].return_value = mock_summarizer
+        
+        processor = PaperProcessor()
+        with patch.object(processor, 'process_via_batch_api') as mock_batch:
+            processor.process_unprocessed_papers(use_batch=True)
+        
+        mock_batch.assert_not_called()
+        assert len(mock_repo.bulk_update_summaries.call_args[0][0]) == 2
+
+
 class TestMainFunction:
     """Test main entry point for process_papers"""
     
@@ -175,7 +378,6 @@ class TestMainFunction:
         mock_processor_class.return_value = mock_processor
         
         try:
-            from src.scheduler.process_papers import main
             main()
             mock_processor.process_unprocessed_papers.assert_called_once_with(limit=1)
         except SystemExit:
@@ -189,7 +391,6 @@ class TestMainFunction:
         mock_processor_class.return_value = mock_processor
         
         try:
-            from src.scheduler.process_papers import main
             main()
             mock_processor.process_unprocessed_papers.assert_called_once_with(limit=5)
         except SystemExit:
@@ -203,7 +404,6 @@ class TestMainFunction:
         mock_processor_class.return_value = mock_processor
         
         try:
-            from src.scheduler.process_papers import main
             main()
             mock_processor.process_unprocessed_papers.assert_called_once_with(limit=None)
         except SystemExit:
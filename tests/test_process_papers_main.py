@@ -1,10 +1,6 @@
 """Comprehensive tests for process_papers main() function"""
 import pytest
 from unittest.mock import Mock, patch
-import sys
-
-# Mock dependencies
-sys.modules['openai'] = Mock()
 
 from src.scheduler.process_papers import PaperProcessor, main
 
@@ -54,8 +50,8 @@ class TestProcessPapersMain:
             except SystemExit:
                 pass
         
-        # Verify processor was called with None (process all)
-        mock_processor.process_unprocessed_papers.assert_called_once_with(limit=None)
+        # Verify processor was called with None (process all) via the batch path
+        mock_processor.process_unprocessed_papers.assert_called_once_with(limit=None, use_batch=True)
     
     @patch('src.scheduler.process_papers.PaperProcessor')
     def test_main_with_exception(self, mock_processor_class):
@@ -1,24 +1,52 @@
 """Tests for database repository"""
+import tracemalloc
 import pytest
 from datetime import datetime, timedelta
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event, insert, text
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
 from src.database.models import Base, Paper
 from src.database.repository import PaperRepository
 
 
+@pytest.fixture(scope="session")
+def engine():
+    """In-memory database with the schema created once per test run"""
+    engine = create_engine(
+        'sqlite:///:memory:',
+        connect_args={'check_same_thread': False},
+        poolclass=StaticPool
+    )
+    
+    # pysqlite defers BEGIN and ignores SAVEPOINT semantics; let SQLAlchemy
+    # emit BEGIN itself so nested transactions roll back correctly
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_begin(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+    
+    @event.listens_for(engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+    
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
 class TestPaperRepository:
     """Test PaperRepository class"""
     
     @pytest.fixture
-    def db_session(self):
-        """Create in-memory database for testing"""
-        engine = create_engine('sqlite:///:memory:')
-        Base.metadata.create_all(engine)
-        Session = sessionmaker(bind=engine)
-        session = Session()
+    def db_session(self, engine):
+        """Session joined to an outer transaction that is rolled back after each test"""
+        connection = engine.connect()
+        transaction = connection.begin()
+        # Repository commits release a SAVEPOINT instead of the outer transaction
+        session = Session(bind=connection, join_transaction_mode="create_savepoint")
         yield session
         session.close()
+        transaction.rollback()
+        connection.close()
     
     @pytest.fixture
     def repo(self, db_session):
@@ -78,6 +106,122 @@ class TestPaperRepository:
         repo.add_paper(sample_paper_data)
         assert repo.exists('test123')
     
+    def test_existing_paper_ids_bulk(self, repo, db_session, sample_paper_data):
+        """Test existing IDs are resolved with a single query"""
+        repo.add_paper(sample_paper_data)
+        repo.add_paper({**sample_paper_data, 'paper_id': 'other456', 'title': 'Other'})
+        
+        statements = []
+        engine = db_session.get_bind()
+        
+        def listener(conn, cursor, statement, *args):
+            statements.append(statement)
+        
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            existing = repo.existing_paper_ids(['test123', 'missing', 'other456', None])
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+        
+        assert existing == {'test123', 'other456'}
+        assert len(statements) == 1
+        assert repo.existing_paper_ids([]) == set()
+    
+    def test_filter_new_papers(self, repo, sample_paper_data):
+        """Test filtering drops papers matching by ID or normalized title"""
+        repo.add_paper(sample_paper_data)
+        
+        fetched = [
+            {'paper_id': 'test123', 'title': 'Renamed'},
+            {'paper_id': 'new1', 'title': '  test paper '},
+            {'paper_id': 'new2', 'title': 'Brand New'},
+            {'semantic_scholar_id': 'new3', 'title': 'Also New'},
+        ]
+        
+        assert repo.filter_new_papers(fetched) == fetched[2:]
+    
+    def test_bloom_filter_prevents_db_query(self, repo, db_session, sample_paper_data):
+        """Test a warmed Bloom filter skips the ID query for new papers and confirms hits"""
+        repo.add_paper(sample_paper_data)
+        repo.warm_bloom()
+        repo.add_paper({'title': 'Added After Warmup', 'paper_id': 'late1'})
+        
+        statements = []
+        engine = db_session.get_bind()
+        
+        def listener(conn, cursor, statement, *args):
+            statements.append(statement)
+        
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            fresh = [{'paper_id': f'new{i}', 'title': f'New {i}'} for i in range(50)]
+            assert repo.filter_new_papers(fresh) == fresh
+            assert len(statements) == 1  # Titles are still confirmed in SQL
+            statements.clear()
+            
+            known = [
+                {'paper_id': 'test123', 'title': 'Renamed'},
+                {'paper_id': 'late1', 'title': 'Whatever'},
+                {'paper_id': 'new1', 'title': ' test paper '},
+            ]
+            assert repo.filter_new_papers(known) == []
+            assert len(statements) == 2
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+    
+    def test_bloom_filter_still_catches_external_titles(self, repo, db_session, sample_paper_data):
+        """Test titles written by other processes after warming are still found"""
+        repo.warm_bloom()
+        db_session.execute(insert(Paper), [{'title': 'Fetched Elsewhere', 'paper_id': 'ext1'}])
+        db_session.commit()
+        
+        fetched = [{'paper_id': 'other-id', 'title': 'fetched elsewhere'}]
+        assert repo.filter_new_papers(fetched) == []
+    
+    def test_bulk_upsert_ignore_skips_existing(self, repo, sample_paper_data):
+        """Test conflicting paper_ids are skipped and only new ids are returned"""
+        existing = repo.add_paper(sample_paper_data)
+        
+        inserted = repo.bulk_upsert_ignore([
+            {**sample_paper_data, 'title': 'Conflicting'},
+            {'paper_id': 'fresh1', 'title': 'Fresh One'},
+            {'paper_id': 'fresh2', 'title': 'Fresh Two'},
+        ])
+        
+        assert len(inserted) == 2
+        assert existing.id not in inserted
+        assert repo.get_by_paper_id('test123').title == 'Test Paper'
+        assert repo.count_all() == 3
+        assert repo.bulk_upsert_ignore([{'paper_id': 'fresh1', 'title': 'Again'}]) == []
+        assert repo.bulk_upsert_ignore([]) == []
+    
+    def test_bulk_insert_core_fast_path(self, repo, db_session):
+        """Test Core bulk insert stores 1000 rows with a single executemany"""
+        papers = [
+            {'paper_id': f'bulk{i}', 'title': f'Bulk Paper {i}', 'citation_count': i}
+            for i in range(1000)
+        ]
+        
+        inserts = []
+        engine = db_session.get_bind()
+        
+        def listener(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith('INSERT INTO PAPERS'):
+                inserts.append((executemany, len(parameters) if executemany else 1))
+        
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            inserted = repo.bulk_insert_core(papers)
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+        
+        assert inserted == 1000
+        assert inserts == [(True, 1000)]
+        assert repo.count_all() == 1000
+        assert repo.pending_count() == 1000
+        assert repo.get_by_paper_id('bulk999').citation_count == 999
+        assert repo.bulk_insert_core([]) == 0
+    
     def test_get_recent_papers(self, repo):
         """Test getting recent papers"""
         # Add papers from different dates
@@ -126,6 +270,17 @@ class TestPaperRepository:
         unprocessed = repo.get_unprocessed(limit=2)
         assert len(unprocessed) == 2
     
+    def test_get_unprocessed_uses_composite_index(self, db_session):
+        """Test unprocessed queue query seeks the (processed, fetched_at) index"""
+        plan = db_session.execute(text(
+            "EXPLAIN QUERY PLAN SELECT * FROM papers "
+            "WHERE processed = 0 ORDER BY fetched_at DESC LIMIT 10"
+        )).fetchall()
+        details = ' '.join(row[-1] for row in plan)
+        
+        assert 'USING INDEX ix_paper_processed_fetched' in details
+        assert 'TEMP B-TREE' not in details
+    
     def test_get_unpublished_papers(self, repo):
         """Test getting unpublished papers"""
         # Processed but not published
@@ -192,6 +347,35 @@ class TestPaperRepository:
         assert paper.investment_insights == '投资洞察'
         assert paper.processed is True
     
+    def test_bulk_update_summaries(self, repo):
+        """Test updating many summaries in one call"""
+        ids = []
+        for i in range(3):
+            paper = repo.add_paper({
+                'title': f'Paper {i}',
+                'paper_id': f'bulk{i}',
+                'processed': False
+            })
+            ids.append(paper.id)
+        
+        repo.bulk_update_summaries([
+            {
+                'id': paper_id,
+                'summary_zh': f'摘要 {paper_id}',
+                'keywords': 'AI, ML',
+                'investment_insights': '投资洞察',
+                'processed': True
+            }
+            for paper_id in ids[:2]
+        ])
+        
+        paper = repo.get_by_paper_id('bulk0')
+        assert paper.summary_zh == f'摘要 {ids[0]}'
+        assert paper.keywords == 'AI, ML'
+        assert paper.investment_insights == '投资洞察'
+        assert paper.processed is True
+        assert repo.count_unprocessed() == 1
+    
     def test_get_papers_by_keyword(self, repo):
         """Test searching papers by keyword"""
         repo.add_paper({
@@ -210,6 +394,35 @@ class TestPaperRepository:
         assert len(ml_papers) == 1
         assert ml_papers[0].paper_id == 'ml1'
     
+    def test_get_papers_by_keyword_tracks_updates_and_deletes(self, repo, db_session):
+        """Test the full-text index follows title edits and deletions"""
+        paper = repo.add_paper({
+            'title': 'Quantum Computing',
+            'paper_id': 'qc1',
+            'abstract': 'About qubits'
+        })
+        
+        paper.title = 'Reinforcement Learning'
+        db_session.commit()
+        assert [p.paper_id for p in repo.get_papers_by_keyword('reinforcement')] == ['qc1']
+        assert repo.get_papers_by_keyword('Quantum') == []
+        
+        db_session.delete(paper)
+        db_session.commit()
+        assert repo.get_papers_by_keyword('reinforcement') == []
+    
+    def test_get_papers_by_keyword_escapes_query_syntax(self, repo):
+        """Test FTS operators in the keyword are matched literally"""
+        repo.add_paper({
+            'title': 'Self-Supervised "Vision" Models',
+            'paper_id': 'ssl1',
+            'abstract': 'About ViT'
+        })
+        
+        assert len(repo.get_papers_by_keyword('Self-Supervised')) == 1
+        assert len(repo.get_papers_by_keyword('"Vision')) == 1
+        assert repo.get_papers_by_keyword('NOT') == []
+    
     def test_get_top_cited_papers(self, repo):
         """Test getting top cited papers"""
         for i in range(5):
@@ -224,6 +437,26 @@ class TestPaperRepository:
         assert len(top_papers) == 3
         assert top_papers[0].citation_count == 40
         assert top_papers[1].citation_count == 30
+        
+        old_paper = repo.add_paper({
+            'title': 'Old Classic',
+            'paper_id': 'cite_old',
+            'citation_count': 1000,
+            'fetched_at': datetime.utcnow() - timedelta(days=365)
+        })
+        assert old_paper not in repo.get_top_cited_papers(limit=3)
+        assert repo.get_top_cited_papers(days=None, limit=3)[0] == old_paper
+    
+    def test_top_cited_uses_citation_index(self, db_session):
+        """Test citation ordering walks ix_paper_citation_desc instead of sorting"""
+        plan = db_session.execute(text(
+            "EXPLAIN QUERY PLAN SELECT * FROM papers "
+            "ORDER BY citation_count DESC LIMIT 3"
+        )).fetchall()
+        details = ' '.join(row[-1] for row in plan)
+        
+        assert 'USING INDEX ix_paper_citation_desc' in details
+        assert 'TEMP B-TREE' not in details
     
     def test_count_unprocessed(self, repo):
         """Test counting unprocessed papers"""
@@ -237,6 +470,36 @@ class TestPaperRepository:
         count = repo.count_unprocessed()
         assert count == 3
     
+    def test_pending_count_tracks_local_writes(self, repo):
+        """Test the cached pending count follows inserts and processed updates"""
+        assert repo.pending_count() == 0
+        
+        for i in range(3):
+            repo.add_paper({'title': f'Pending {i}', 'paper_id': f'pend{i}'})
+        repo.add_paper({'title': 'Done', 'paper_id': 'done1', 'processed': True})
+        assert repo.pending_count() == 3
+        
+        repo.mark_as_processed('pend0')
+        repo.mark_as_processed('pend0')  # Already processed, no double count
+        repo.update_summary('pend1', '摘要', 'kw', 'insights')
+        assert repo.pending_count() == 1
+        
+        paper = repo.get_by_paper_id('pend2')
+        repo.bulk_update_summaries([{'id': paper.id, 'processed': True}])
+        assert repo.pending_count() == 0
+        assert repo.count_unprocessed() == 0
+    
+    def test_pending_count_resyncs_after_ttl(self, repo, db_session, monkeypatch):
+        """Test writes from elsewhere are picked up once the cached count expires"""
+        assert repo.pending_count() == 0
+        
+        db_session.execute(insert(Paper), [{'title': 'External', 'paper_id': 'ext1'}])
+        db_session.commit()
+        assert repo.pending_count() == 0  # Still cached
+        
+        monkeypatch.setattr(PaperRepository, 'PENDING_COUNT_TTL', -1)
+        assert repo.pending_count() == 1
+    
     def test_get_all_papers(self, repo):
         """Test getting all papers"""
         for i in range(10):
@@ -250,3 +513,22 @@ class TestPaperRepository:
         
         limited = repo.get_all_papers(limit=5)
         assert len(limited) == 5
+    
+    def test_iter_all_papers_memory(self, repo, db_session):
+        """Test streaming 10k papers keeps peak memory bounded by the chunk size"""
+        db_session.execute(insert(Paper), [
+            {'title': f'Paper {i}', 'paper_id': f'stream{i}', 'abstract': 'x' * 200}
+            for i in range(10000)
+        ])
+        db_session.commit()
+        
+        tracemalloc.start()
+        try:
+            count = sum(1 for _ in repo.iter_all_papers(chunk_size=500))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        
+        assert count == 10000
+        # Materializing all rows peaks around 17 MB; streaming stays near 2 MB
+        assert peak < 5 * 1024 * 1024
@@ -0,0 +1,53 @@
+"""Tests for LLM response cache"""
+import pytest
+from unittest.mock import patch
+
+from src.processors.response_cache import ResponseCache
+
+
+class TestResponseCache:
+    """Test ResponseCache class"""
+    
+    @pytest.fixture
+    def cache(self, tmp_path):
+        """Create cache backed by a temporary file"""
+        cache = ResponseCache(tmp_path / "cache" / "llm_cache.db")
+        yield cache
+        cache.close()
+    
+    def test_miss_returns_none(self, cache):
+        """Test unknown key is a miss"""
+        assert cache.get('missing') is None
+    
+    def test_set_and_get(self, cache):
+        """Test stored value is returned"""
+        cache.set('key', '摘要')
+        assert cache.get('key') == '摘要'
+    
+    def test_set_replaces_value(self, cache):
+        """Test storing twice keeps the latest value"""
+        cache.set('key', 'old')
+        cache.set('key', 'new')
+        assert cache.get('key') == 'new'
+    
+    def test_persists_across_instances(self, tmp_path):
+        """Test entries survive reopening the database"""
+        path = tmp_path / "llm_cache.db"
+        ResponseCache(path).set('key', 'value')
+        
+        assert ResponseCache(path).get('key') == 'value'
+    
+    def test_expired_entry_is_miss(self, tmp_path):
+        """Test entries older than the TTL are ignored"""
+        cache = ResponseCache(tmp_path / "llm_cache.db", ttl_days=1)
+        
+        with patch('src.processors.response_cache.time.time', return_value=0):
+            cache.set('key', 'value')
+        
+        with patch('src.processors.response_cache.time.time', return_value=2 * 86400):
+            assert cache.get('key') is None
+    
+    def test_make_key_separates_parts(self):
+        """Test key parts cannot collide by concatenation"""
+        assert ResponseCache.make_key('ab', 'c') != ResponseCache.make_key('a', 'bc')
+        assert ResponseCache.make_key('a', 'b') == ResponseCache.make_key('a', 'b')
@@ -4,28 +4,24 @@ from unittest.mock import Mock, patch, MagicMock, PropertyMock
 from datetime import datetime
 import sys
 
-# Mock all external dependencies
-sys.modules['apscheduler'] = Mock()
-sys.modules['apscheduler.schedulers'] = Mock()
-sys.modules['apscheduler.schedulers.blocking'] = Mock()
-sys.modules['apscheduler.triggers'] = Mock()
-sys.modules['apscheduler.triggers.cron'] = Mock()
-sys.modules['arxiv'] = Mock()
-sys.modules['scholarly'] = Mock()
+from src.database.repository import PaperRepository
+from src.scrapers.openalex_scraper import OpenAlexScraper
+from src.scrapers.semantic_scholar_scraper import SemanticScholarScraper
+
 
 @pytest.fixture
 def mock_dependencies():
     """Mock all dependencies for scheduler"""
     with patch('src.scheduler.daily_scheduler.init_database') as mock_init_db, \
          patch('src.scheduler.daily_scheduler.PaperRepository') as mock_repo, \
-         patch('src.scheduler.daily_scheduler.ArxivScraper') as mock_arxiv, \
+         patch('src.scheduler.daily_scheduler.OpenAlexScraper') as mock_openalex, \
          patch('src.scheduler.daily_scheduler.SemanticScholarScraper') as mock_ss, \
          patch('src.scheduler.daily_scheduler.BlockingScheduler') as mock_scheduler:
         
         yield {
             'init_db': mock_init_db,
             'repo': mock_repo,
-            'arxiv': mock_arxiv,
+            'openalex': mock_openalex,
             'ss': mock_ss,
             'scheduler': mock_scheduler
         }
@@ -39,26 +35,31 @@ class TestDailyPaperScheduler:
         from src.scheduler.daily_scheduler import DailyPaperScheduler
         
         mock_dependencies['repo'].return_value = Mock()
-        mock_dependencies['arxiv'].return_value = Mock()
+        mock_dependencies['openalex'].return_value = Mock()
         mock_dependencies['ss'].return_value = Mock()
         
         scheduler = DailyPaperScheduler()
         
         assert scheduler is not None
         assert hasattr(scheduler, 'logger')
-        assert hasattr(scheduler, 'paper_repo')
+        # Collaborators come from the patched classes; tests need not reassign them
+        assert scheduler.paper_repo is mock_dependencies['repo'].return_value
+        assert scheduler.ss_scraper is mock_dependencies['ss'].return_value
+        assert scheduler.openalex_scraper is mock_dependencies['openalex'].return_value
     
     def test_fetch_and_store_papers_success(self, mock_dependencies):
         """Test successful paper fetch and store"""
         from src.scheduler.daily_scheduler import DailyPaperScheduler
         
         # Setup mocks
-        mock_paper_repo = Mock()
+        mock_paper_repo = MagicMock(spec=PaperRepository)
         mock_paper_repo.get_by_paper_id.return_value = None  # No duplicate
-        mock_paper_repo.add_paper.return_value = Mock(id=1)
+        mock_paper_repo.filter_new_papers.side_effect = lambda papers: papers
+        mock_paper_repo.deduplicate.return_value = {'removed_by_paper_id': 0, 'removed_by_title': 0}
+        mock_paper_repo.bulk_upsert_ignore.return_value = [1]
         mock_dependencies['repo'].return_value = mock_paper_repo
         
-        mock_ss_scraper = Mock()
+        mock_ss_scraper = MagicMock(spec=SemanticScholarScraper)
         mock_ss_scraper.get_recent_papers.return_value = [
             {
                 'paper_id': 'test123',
@@ -68,52 +69,105 @@ class TestDailyPaperScheduler:
         ]
         mock_dependencies['ss'].return_value = mock_ss_scraper
         
+        mock_openalex_scraper = MagicMock(spec=OpenAlexScraper)
+        mock_dependencies['openalex'].return_value = mock_openalex_scraper
+        
         scheduler = DailyPaperScheduler()
-        scheduler.paper_repo = mock_paper_repo
-        scheduler.ss_scraper = mock_ss_scraper
         
         result = scheduler.fetch_and_store_papers()
         
-        # Should have attempted to fetch
+        # Semantic Scholar succeeded, so the OpenAlex fallback is never started
         assert mock_ss_scraper.get_recent_papers.called
+        mock_openalex_scraper.get_recent_papers.assert_not_called()
+        mock_paper_repo.bulk_upsert_ignore.assert_called_once_with(
+            [mock_ss_scraper.get_recent_papers.return_value[0]]
+        )
+        assert result == (1, 0)
+    
+    def test_fetch_falls_back_to_openalex(self, mock_dependencies):
+        """Test OpenAlex is queried only after Semantic Scholar comes back empty"""
+        from src.scheduler.daily_scheduler import DailyPaperScheduler
+        
+        mock_paper_repo = MagicMock(spec=PaperRepository)
+        mock_paper_repo.filter_new_papers.side_effect = lambda papers: papers
+        mock_paper_repo.deduplicate.return_value = {'removed_by_paper_id': 0, 'removed_by_title': 0}
+        mock_paper_repo.bulk_upsert_ignore.return_value = [1]
+        mock_dependencies['repo'].return_value = mock_paper_repo
+        
+        calls = []
+        mock_ss_scraper = MagicMock(spec=SemanticScholarScraper)
+        mock_ss_scraper.get_recent_papers.side_effect = lambda **kwargs: calls.append('ss') or []
+        mock_dependencies['ss'].return_value = mock_ss_scraper
+        
+        fallback_paper = {'paper_id': 'oa123', 'title': 'Fallback Paper', 'citation_count': 500}
+        mock_openalex_scraper = MagicMock(spec=OpenAlexScraper)
+        mock_openalex_scraper.get_recent_papers.side_effect = lambda **kwargs: calls.append('openalex') or [fallback_paper]
+        mock_dependencies['openalex'].return_value = mock_openalex_scraper
+        
+        scheduler = DailyPaperScheduler()
+        
+        assert scheduler.fetch_and_store_papers() == (1, 0)
+        assert calls == ['ss', 'openalex']
+        mock_paper_repo.bulk_upsert_ignore.assert_called_once_with([fallback_paper])
+    
+    def test_fetch_dedupes_repeated_paper_ids(self, mock_dependencies):
+        """Test repeated paper IDs in fetched results are collapsed, keeping order"""
+        from src.scheduler.daily_scheduler import DailyPaperScheduler
+        
+        papers = [
+            {'paper_id': 'a', 'title': 'A'},
+            {'paper_id': 'b', 'title': 'B'},
+            {'paper_id': 'a', 'title': 'A again'},
+            {'title': 'No ID'},
+        ]
+        
+        assert DailyPaperScheduler._dedupe_by_paper_id(papers) == [
+            papers[0], papers[1], papers[3]
+        ]
     
     def test_fetch_no_new_papers(self, mock_dependencies):
         """Test fetch when all papers already exist"""
         from src.scheduler.daily_scheduler import DailyPaperScheduler
         
-        mock_paper_repo = Mock()
+        mock_paper_repo = MagicMock(spec=PaperRepository)
         mock_paper_repo.get_by_paper_id.return_value = Mock()  # Paper exists
+        # Passes the pre-check but another writer stored it first
+        mock_paper_repo.filter_new_papers.side_effect = lambda papers: papers
+        mock_paper_repo.bulk_upsert_ignore.return_value = []
+        mock_paper_repo.deduplicate.return_value = {'removed_by_paper_id': 0, 'removed_by_title': 0}
         mock_dependencies['repo'].return_value = mock_paper_repo
         
-        mock_ss_scraper = Mock()
+        mock_ss_scraper = MagicMock(spec=SemanticScholarScraper)
         mock_ss_scraper.get_recent_papers.return_value = [
             {'paper_id': 'existing123', 'title': 'Existing'}
         ]
         mock_dependencies['ss'].return_value = mock_ss_scraper
         
         scheduler = DailyPaperScheduler()
-        scheduler.paper_repo = mock_paper_repo
-        scheduler.ss_scraper = mock_ss_scraper
         
         result = scheduler.fetch_and_store_papers()
         
-        # Should not add duplicate
+        # Should not add duplicate, and never probe rows one at a time
         mock_paper_repo.add_paper.assert_not_called()
+        mock_paper_repo.get_by_paper_id.assert_not_called()
+        mock_paper_repo.bulk_upsert_ignore.assert_called_once_with(
+            mock_ss_scraper.get_recent_papers.return_value
+        )
+        assert result == (0, 0)
     
     def test_fetch_empty_results(self, mock_dependencies):
         """Test fetch with no results from API"""
         from src.scheduler.daily_scheduler import DailyPaperScheduler
         
-        mock_paper_repo = Mock()
+        mock_paper_repo = MagicMock(spec=PaperRepository)
+        mock_paper_repo.deduplicate.return_value = {'removed_by_paper_id': 0, 'removed_by_title': 0}
         mock_dependencies['repo'].return_value = mock_paper_repo
         
-        mock_ss_scraper = Mock()
+        mock_ss_scraper = MagicMock(spec=SemanticScholarScraper)
         mock_ss_scraper.get_recent_papers.return_value = []
         mock_dependencies['ss'].return_value = mock_ss_scraper
         
         scheduler = DailyPaperScheduler()
-        scheduler.paper_repo = mock_paper_repo
-        scheduler.ss_scraper = mock_ss_scraper
         
         result = scheduler.fetch_and_store_papers()
         
@@ -133,6 +187,50 @@ class TestDailyPaperScheduler:
         # Test start method exists
         assert hasattr(scheduler, 'start')
     
+    @patch('src.scheduler.daily_scheduler.JobProcessPoolExecutor')
+    @patch('src.scheduler.daily_scheduler.JobThreadPoolExecutor')
+    def test_scheduler_uses_two_executors(self, mock_thread_pool, mock_process_pool, mock_dependencies):
+        """Test fetch jobs run on threads and summarization on worker processes"""
+        from src.scheduler.daily_scheduler import DailyPaperScheduler, run_paper_processing
+        
+        scheduler = DailyPaperScheduler()
+        
+        mock_dependencies['scheduler'].assert_called_once_with(executors={
+            'default': mock_thread_pool.return_value,
+            'process': mock_process_pool.return_value
+        })
+        mock_thread_pool.assert_called_once_with(4)
+        mock_process_pool.assert_called_once_with(2)
+        
+        scheduler.fetch_and_store_papers = Mock()
+        scheduler.start(schedule_time="01:00", process_time="03:30")
+        
+        jobs = {
+            call.kwargs['id']: call
+            for call in scheduler.scheduler.add_job.call_args_list
+        }
+        assert jobs['daily_paper_fetch'].kwargs['executor'] == 'default'
+        assert jobs['daily_paper_processing'].args[0] is run_paper_processing
+        assert jobs['daily_paper_processing'].kwargs['executor'] == 'process'
+    
+    @pytest.mark.parametrize("start_kwargs, expected_limit", [
+        ({}, 1),
+        ({'process_limit': 5}, 5),
+    ], ids=["default", "explicit"])
+    def test_processing_job_is_capped(self, mock_dependencies, start_kwargs, expected_limit):
+        """Test the daily summarization job only processes process_limit papers"""
+        from src.scheduler.daily_scheduler import DailyPaperScheduler
+        
+        scheduler = DailyPaperScheduler()
+        scheduler.fetch_and_store_papers = Mock()
+        scheduler.start(**start_kwargs)
+        
+        jobs = {
+            call.kwargs['id']: call
+            for call in scheduler.scheduler.add_job.call_args_list
+        }
+        assert jobs['daily_paper_processing'].kwargs['kwargs'] == {'limit': expected_limit}
+    
     def test_api_key_configuration(self, mock_dependencies, monkeypatch):
         """Test API key configuration"""
         from src.scheduler.daily_scheduler import DailyPaperScheduler
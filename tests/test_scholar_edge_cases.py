@@ -1,43 +1,37 @@
 """Additional tests for scholar scraper specific coverage"""
 import pytest
-from unittest.mock import Mock, patch, MagicMock
-import sys
-
-# Mock scholarly before importing
-scholarly_mock = Mock()
-sys.modules['scholarly'] = scholarly_mock
+from unittest.mock import patch
+from itertools import count, islice
 
 from src.scrapers.scholar_scraper import ScholarScraper
-from src.utils.logger import setup_logger
+
+pytestmark = [pytest.mark.filterwarnings("ignore::DeprecationWarning")]
+
+
+@pytest.fixture(scope="module")
+def scraper(logger):
+    """Create scholar scraper (stateless between calls, safe to share)"""
+    return ScholarScraper(logger)
 
 
 class TestScholarScraperErrorHandling:
     """Test scholar scraper error handling and edge cases"""
     
-    @pytest.fixture
-    def scraper(self):
-        """Create scholar scraper"""
-        logger = setup_logger("test")
-        return ScholarScraper(logger)
-    
+    @pytest.mark.parametrize("exc", [
+        Exception("Scholarly error"),
+        TimeoutError("Request timeout"),
+        ConnectionError("Network error"),
+    ], ids=["exception", "timeout", "network_error"])
+    @patch('src.scrapers.scholar_scraper.time.sleep')
     @patch('src.scrapers.scholar_scraper.scholarly.search_pubs')
-    def test_search_with_exception(self, mock_search, scraper):
-        """Test handling exception in search"""
-        mock_search.side_effect = Exception("Scholarly error")
+    def test_search_error_paths(self, mock_search, mock_sleep, scraper, exc):
+        """Test search and get_recent_papers swallow scholarly errors"""
+        mock_search.side_effect = exc
         
-        results = scraper.search("test query")
-        assert len(results) == 0
+        assert scraper.search("test") == []
+        assert scraper.get_recent_papers(["test"]) == []
     
-    @patch('src.scrapers.scholar_scraper.scholarly.search_pubs')
-    def test_search_with_network_timeout(self, mock_search, scraper):
-        """Test handling network timeout"""
-        mock_search.side_effect = TimeoutError("Request timeout")
-        
-        results = scraper.search("test")
-        assert len(results) == 0
-    
-    @patch('src.scrapers.scholar_scraper.scholarly.search_pubs')
-    def test_normalize_with_missing_fields(self, mock_search, scraper):
+    def test_normalize_with_missing_fields(self, scraper):
         """Test normalizing result with missing fields"""
         paper = {
             'bib': {
@@ -50,8 +44,7 @@ class TestScholarScraperErrorHandling:
         assert normalized['title'] == 'Test Paper'
         assert normalized['authors'] == ''  # Should handle missing authors
     
-    @patch('src.scrapers.scholar_scraper.scholarly.search_pubs')
-    def test_normalize_with_no_bib(self, mock_search, scraper):
+    def test_normalize_with_no_bib(self, scraper):
         """Test normalizing result without bib field"""
         paper = {}  # No 'bib' field
         
@@ -60,8 +53,7 @@ class TestScholarScraperErrorHandling:
         except:
             pass  # Expected to fail or handle gracefully
     
-    @patch('src.scrapers.scholar_scraper.scholarly.search_pubs')
-    def test_normalize_with_invalid_year(self, mock_search, scraper):
+    def test_normalize_with_invalid_year(self, scraper):
         """Test handling invalid year format"""
         paper = {
             'bib': {
@@ -73,8 +65,7 @@ class TestScholarScraperErrorHandling:
         normalized = scraper._normalize_paper(paper)
         assert normalized.get('year') is None or isinstance(normalized.get('year'), int)
     
-    @patch('src.scrapers.scholar_scraper.scholarly.search_pubs')
-    def test_normalize_with_missing_year(self, mock_search, scraper):
+    def test_normalize_with_missing_year(self, scraper):
         """Test normalizing without year field"""
         paper = {
             'bib': {
@@ -95,16 +86,7 @@ class TestScholarScraperErrorHandling:
         results = scraper.search("test")
         assert len(results) == 0
     
-    @patch('src.scrapers.scholar_scraper.scholarly.search_pubs')
-    def test_get_recent_papers_with_error(self, mock_search, scraper):
-        """Test get_recent_papers when scholarly raises error"""
-        mock_search.side_effect = ConnectionError("Network error")
-        
-        results = scraper.get_recent_papers(year=2024, keyword="test")
-        assert len(results) == 0
-    
-    @patch('src.scrapers.scholar_scraper.scholarly.search_pubs')
-    def test_normalize_with_malformed_author(self, mock_search, scraper):
+    def test_normalize_with_malformed_author(self, scraper):
         """Test normalizing with malformed author data"""
         paper = {
             'bib': {
@@ -119,8 +101,7 @@ class TestScholarScraperErrorHandling:
         except:
             pass
     
-    @patch('src.scrapers.scholar_scraper.scholarly.search_pubs')
-    def test_normalize_with_pub_url(self, mock_search, scraper):
+    def test_normalize_with_pub_url(self, scraper):
         """Test extracting pub_url field"""
         paper = {
             'bib': {
@@ -133,8 +114,7 @@ class TestScholarScraperErrorHandling:
         normalized = scraper._normalize_paper(paper)
         assert normalized.get('url') or normalized.get('pdf_url')
     
-    @patch('src.scrapers.scholar_scraper.scholarly.search_pubs')
-    def test_normalize_with_venue_field(self, mock_search, scraper):
+    def test_normalize_with_venue_field(self, scraper):
         """Test extracting venue from bib"""
         paper = {
             'bib': {
@@ -150,11 +130,6 @@ class TestScholarScraperErrorHandling:
 class TestScholarScraperFiltering:
     """Test scholar scraper filtering logic"""
     
-    @pytest.fixture
-    def scraper(self):
-        logger = setup_logger("test")
-        return ScholarScraper(logger)
-    
     @patch('src.scrapers.scholar_scraper.scholarly.search_pubs')
     def test_filter_by_year(self, mock_search, scraper):
         """Test filtering results by year"""
@@ -162,7 +137,7 @@ class TestScholarScraperFiltering:
             {'bib': {'title': 'Old Paper', 'pub_year': '2020'}},
             {'bib': {'title': 'New Paper', 'pub_year': '2024'}}
         ]
-        mock_search.return_value = iter(mock_results)
+        mock_search.return_value = mock_results
         
         results = scraper.get_recent_papers(year=2023, keyword="test")
         
@@ -175,11 +150,10 @@ class TestScholarScraperFiltering:
     @patch('src.scrapers.scholar_scraper.scholarly.search_pubs')  
     def test_search_with_max_results_limit(self, mock_search, scraper):
         """Test respecting max_results limit"""
-        # Create many mock results
-        mock_results = [
-            {'bib': {'title': f'Paper {i}'}} for i in range(100)
-        ]
-        mock_search.return_value = iter(mock_results)
+        # Lazily yield more results than the limit; only the consumed ones are built
+        mock_search.return_value = (
+            {'bib': {'title': f'Paper {i}'}} for i in islice(count(), 10)
+        )
         
         results = scraper.search("test", max_results=5)
         
@@ -1,25 +1,16 @@
 """Tests for Google Scholar scraper"""
 import pytest
-from unittest.mock import Mock, patch, MagicMock
-from datetime import datetime
-import sys
-
-# Mock scholarly module
-sys.modules['scholarly'] = Mock()
+from unittest.mock import MagicMock, patch
 
 from src.scrapers.scholar_scraper import ScholarScraper
-from src.utils.logger import setup_logger
+
+pytestmark = [pytest.mark.filterwarnings("ignore::DeprecationWarning")]
 
 
 class TestScholarScraper:
     """Test ScholarScraper class"""
     
-    @pytest.fixture
-    def logger(self):
-        """Create test logger"""
-        return setup_logger("test_scholar_scraper")
-    
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def scraper(self, logger):
         """Create scraper instance"""
         return ScholarScraper(logger, rate_limit_delay=0)
@@ -37,8 +28,7 @@ class TestScholarScraper:
     
     def test_search_with_mock(self, scraper, mock_scholarly):
         """Test search with mocked scholarly"""
-        mock_result = Mock()
-        mock_result.__getitem__ = Mock(side_effect=lambda k: {
+        data = {
             'title': 'Test Paper',
             'author': ['John Doe'],
             'pub_year': '2024',
@@ -46,7 +36,10 @@ class TestScholarScraper:
             'abstract': 'Test abstract',
             'num_citations': 42,
             'url_scholarbib': 'scholar_id_123'
-        }.get(k))
+        }
+        mock_result = MagicMock()
+        mock_result.__getitem__.side_effect = data.__getitem__
+        mock_result.get.side_effect = data.get
         
         mock_scholarly.search_pubs.return_value = [mock_result]
         
@@ -57,13 +50,15 @@ class TestScholarScraper:
     
     def test_get_recent_papers_with_mock(self, scraper, mock_scholarly):
         """Test getting recent papers"""
-        mock_result = Mock()
-        mock_result.__getitem__ = Mock(side_effect=lambda k: {
-            'title': f'Paper about AI',
+        data = {
+            'title': 'Paper about AI',
             'author': ['Author'],
             'pub_year': '2024',
             'num_citations': 10
-        }.get(k))
+        }
+        mock_result = MagicMock()
+        mock_result.__getitem__.side_effect = data.__getitem__
+        mock_result.get.side_effect = data.get
         
         mock_scholarly.search_pubs.return_value = [mock_result]
         
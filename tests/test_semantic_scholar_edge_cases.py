@@ -1,82 +1,87 @@
 """Additional tests for semantic scholar scraper specific coverage"""
+import threading
 import pytest
-from unittest.mock import Mock, patch, MagicMock
-import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
 import requests
-
-sys.modules['arxiv'] = Mock()
+from urllib3 import HTTPResponse
 
 from src.scrapers.semantic_scholar_scraper import SemanticScholarScraper
 from src.utils.logger import setup_logger
 
+# A full 100-paper /paper/search page, built once; tests must not mutate it
+_BIG_SEARCH_PAYLOAD = {'data': [{'paperId': f'id{i}', 'title': f'Paper {i}'} for i in range(100)]}
 
-class TestSemanticScholarAPIErrors:
-    """Test semantic scholar API error handling"""
-    
-    @pytest.fixture
-    def scraper(self):
-        """Create scraper"""
-        logger = setup_logger("test")
-        return SemanticScholarScraper(logger, api_key=None)
-    
-    @patch('requests.get')
-    def test_search_with_404_error(self, mock_get, scraper):
-        """Test handling 404 not found"""
-        mock_response = Mock()
-        mock_response.status_code = 404
-        mock_response.raise_for_status.side_effect = requests.HTTPError("404")
-        mock_get.return_value = mock_response
-        
-        results = scraper.search("test")
-        assert len(results) == 0
+
+class _UnavailableHandler(BaseHTTPRequestHandler):
+    """Answers every request with 503 and counts the hits"""
     
-    @patch('requests.get')
-    def test_search_with_500_error(self, mock_get, scraper):
-        """Test handling 500 server error"""
-        mock_response = Mock()
-        mock_response.status_code = 500
-        mock_response.raise_for_status.side_effect = requests.HTTPError("500")
-        mock_get.return_value = mock_response
-        
-        results = scraper.search("test")
-        assert len(results) == 0
+    def _unavailable(self):
+        self.server.hits += 1
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        self.send_response(503)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
     
-    @patch('requests.get')
-    def test_search_with_timeout(self, mock_get, scraper):
-        """Test handling request timeout"""
-        mock_get.side_effect = requests.Timeout("Request timeout")
-        
-        results = scraper.search("test")
-        assert len(results) == 0
+    do_GET = do_POST = _unavailable
     
-    @patch('requests.get')
-    def test_search_with_connection_error(self, mock_get, scraper):
-        """Test handling connection error"""
-        mock_get.side_effect = requests.ConnectionError("Connection failed")
-        
-        results = scraper.search("test")
-        assert len(results) == 0
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def unavailable_server():
+    """Local HTTP server that is permanently unavailable (503)"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _UnavailableHandler)
+    server.hits = 0
+    server.url = f"http://127.0.0.1:{server.server_port}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(scope="module")
+def scraper():
+    """Create scraper once per module (network calls are patched, no state is mutated)"""
+    logger = setup_logger("test")
+    return SemanticScholarScraper(logger, api_key=None)
+
+
+class TestSemanticScholarAPIErrors:
+    """Test semantic scholar API error handling"""
     
-    @patch('requests.get')
-    def test_get_paper_details_with_404(self, mock_get, scraper):
-        """Test getting paper details with 404 error"""
-        mock_response = Mock()
-        mock_response.status_code = 404
-        mock_response.raise_for_status.side_effect = requests.HTTPError("404")
-        mock_get.return_value = mock_response
+    @pytest.mark.parametrize("status, exc", [
+        (404, None),
+        (500, None),
+        (None, requests.Timeout("Request timeout")),
+        (None, requests.ConnectionError("Connection failed")),
+    ], ids=["404", "500", "timeout", "connection_error"])
+    @patch('requests.Session.get')
+    def test_search_error_paths(self, mock_get, scraper, fake_resp, status, exc):
+        """Test search returns no papers on HTTP errors and network failures"""
+        if status:
+            mock_get.return_value = fake_resp(status=status, raises=requests.HTTPError(str(status)))
+        mock_get.side_effect = exc
         
-        result = scraper.get_paper_details("invalid-id")
-        assert result is None
+        assert scraper.search("test") == []
     
-    @patch('requests.get')
-    def test_get_paper_details_with_network_error(self, mock_get, scraper):
-        """Test getting paper details with network error"""
-        mock_get.side_effect = ConnectionError("Network error")
+    @pytest.mark.parametrize("status, exc", [
+        (404, None),
+        (None, requests.Timeout("Request timeout")),
+        (None, requests.ConnectionError("Network error")),
+    ], ids=["404", "timeout", "connection_error"])
+    @patch('requests.Session.get')
+    def test_get_paper_by_arxiv_id_error_paths(self, mock_get, scraper, fake_resp, status, exc):
+        """Test single-paper lookups return None when not found or on network failures"""
+        if status:
+            mock_get.return_value = fake_resp(status=status, raises=requests.HTTPError(str(status)))
+        mock_get.side_effect = exc
         
-        result = scraper.get_paper_details("test-id")
-        assert result is None
+        assert scraper.get_paper_by_arxiv_id("2401.12345") is None
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_get_recent_papers_with_api_error(self, mock_get, scraper):
         """Test get_recent_papers with API error"""
         mock_get.side_effect = requests.HTTPError("API Error")
@@ -88,11 +93,6 @@ class TestSemanticScholarAPIErrors:
 class TestSemanticScholarNormalization:
     """Test paper normalization edge cases"""
     
-    @pytest.fixture
-    def scraper(self):
-        logger = setup_logger("test")
-        return SemanticScholarScraper(logger)
-    
     def test_normalize_without_external_ids(self, scraper):
         """Test normalizing paper without externalIds"""
         paper = {
@@ -181,43 +181,61 @@ class TestSemanticScholarNormalization:
 class TestSemanticScholarRetryLogic:
     """Test retry logic for rate limiting"""
     
-    @pytest.fixture
-    def scraper(self):
-        logger = setup_logger("test")
-        return SemanticScholarScraper(logger)
+    def test_retry_on_429_configured(self, scraper):
+        """Test 429 is retried by the session adapter, honouring Retry-After"""
+        retry = scraper.session.get_adapter(scraper.BASE_URL).max_retries
+        
+        assert 429 in retry.status_forcelist
+        assert retry.respect_retry_after_header
+        assert retry.is_retry("GET", status_code=429)
     
-    @patch('requests.get')
     @patch('time.sleep')
-    def test_retry_on_429_then_success(self, mock_sleep, mock_get, scraper):
-        """Test retry succeeds after 429"""
-        # First call returns 429, second succeeds
-        mock_response_429 = Mock()
-        mock_response_429.status_code = 429
+    def test_retry_sleeps_for_retry_after(self, mock_sleep, scraper):
+        """Test the server's Retry-After wins over exponential backoff"""
+        retry = scraper.session.get_adapter(scraper.BASE_URL).max_retries
+        response = HTTPResponse(status=429, headers={'Retry-After': '2'})
         
-        mock_response_ok = Mock()
-        mock_response_ok.status_code = 200
-        mock_response_ok.json.return_value = {'data': []}
+        retry.sleep(response)
         
-        mock_get.side_effect = [mock_response_429, mock_response_ok]
+        mock_sleep.assert_called_once_with(2)
+    
+    def test_backoff_is_jittered_and_capped(self, scraper):
+        """Test fallback backoff grows exponentially with jitter up to the cap"""
+        retry = scraper.session.get_adapter(scraper.BASE_URL).max_retries
+        for _ in range(3):
+            retry = retry.increment("GET", "/paper/search", response=HTTPResponse(status=503))
         
-        results = scraper.search("test")
+        assert 4 <= retry.get_backoff_time() <= 5
+        assert retry.backoff_max == 32
+    
+    @pytest.mark.parametrize("call", [
+        lambda scraper: scraper.get_paper_by_arxiv_id('2401.12345'),
+        lambda scraper: scraper._get_batch(['2401.12345']),
+    ], ids=["arxiv_lookup", "batch"])
+    @patch('time.sleep')
+    def test_exhausted_retries_raise_http_error(self, mock_sleep, logger, unavailable_server, call):
+        """Test a 503 outlasting the real adapter's retries surfaces as HTTPError"""
+        scraper = SemanticScholarScraper(logger, rate_limit_delay=0)
+        scraper.BASE_URL = unavailable_server.url
+        # Route the local plain-HTTP server through the configured retrying adapter
+        scraper.session.mount('http://', scraper.session.get_adapter('https://api.semanticscholar.org'))
+        
+        with pytest.raises(requests.HTTPError) as excinfo:
+            call(scraper)
         
-        # Should have retried
-        assert mock_sleep.called
-        assert isinstance(results, list)
+        assert excinfo.value.response.status_code == 503
+        assert unavailable_server.hits == 6  # First attempt + 5 retries
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     @patch('time.sleep')
-    def test_retry_exhaustion_on_429(self, mock_sleep, mock_get, scraper):
+    def test_retry_exhaustion_on_429(self, mock_sleep, mock_get, scraper, fake_resp):
         """Test retry exhaustion when 429 persists"""
-        mock_response = Mock()
-        mock_response.status_code = 429
-        mock_get.return_value = mock_response
+        mock_get.return_value = fake_resp(status=429)
         
         results = scraper.search("test")
         
-        # Should have tried multiple times
-        assert mock_get.call_count >= 1
+        # A 429 reaching the scraper means the adapter's retries are spent
+        assert mock_get.call_count == 1
         assert len(results) == 0
 
 
@@ -238,45 +256,43 @@ class TestSemanticScholarAPIKey:
         
         assert scraper.api_key is None
     
-    @patch('requests.get')
-    def test_request_includes_api_key(self, mock_get):
+    @patch('requests.Session.get')
+    def test_request_includes_api_key(self, mock_get, fake_resp):
         """Test that API key is included in headers"""
         logger = setup_logger("test")
         scraper = SemanticScholarScraper(logger, api_key="test-key")
         
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {'data': []}
-        mock_get.return_value = mock_response
+        mock_get.return_value = fake_resp(json={'data': []})
         
         scraper.search("test")
         
-        # Verify headers contain API key
-        call_args = mock_get.call_args
-        if call_args and 'headers' in call_args[1]:
-            headers = call_args[1]['headers']
-            assert 'x-api-key' in headers or 'X-API-Key' in headers
+        # Headers are session defaults rather than per-call arguments
+        assert scraper.session.headers['x-api-key'] == "test-key"
+        assert 'headers' not in mock_get.call_args[1]
 
 
 class TestSemanticScholarPagination:
     """Test pagination and limit handling"""
     
-    @pytest.fixture
-    def scraper(self):
-        logger = setup_logger("test")
-        return SemanticScholarScraper(logger)
-    
-    @patch('requests.get')
-    def test_search_respects_limit(self, mock_get, scraper):
+    @patch('requests.Session.get')
+    def test_search_respects_limit(self, mock_get, scraper, fake_resp):
         """Test that search respects max_results limit"""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            'data': [{'paperId': f'id{i}', 'title': f'Paper {i}'} for i in range(100)]
-        }
-        mock_get.return_value = mock_response
+        mock_get.return_value = fake_resp(json=_BIG_SEARCH_PAYLOAD)
         
         results = scraper.search("test", max_results=10)
         
         # Should limit results
         assert len(results) <= 10
+    
+    @patch('requests.Session.get')
+    def test_search_stream_parses_with_ijson(self, mock_get, scraper, fake_resp, monkeypatch):
+        """Test search reads the raw body incrementally when ijson is installed"""
+        monkeypatch.setattr('src.scrapers.semantic_scholar_scraper.ijson', pytest.importorskip('ijson'))
+        response = fake_resp(json=_BIG_SEARCH_PAYLOAD)
+        response.json = lambda: pytest.fail("body should be streamed, not decoded whole")
+        mock_get.return_value = response
+        
+        results = scraper.search("test", max_results=10)
+        
+        assert [p['title'] for p in results] == [f'Paper {i}' for i in range(10)]
+        assert mock_get.call_args[1]['stream'] is True
@@ -1,7 +1,12 @@
 """Tests for Semantic Scholar scraper"""
+import io
+import json
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+import requests
+from unittest.mock import patch
+from urllib3 import HTTPResponse
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from src.scrapers.semantic_scholar_scraper import SemanticScholarScraper
 from src.utils.logger import setup_logger
 
@@ -9,12 +14,12 @@ from src.utils.logger import setup_logger
 class TestSemanticScholarScraper:
     """Test SemanticScholarScraper class"""
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def logger(self):
         """Create test logger"""
         return setup_logger("test_ss_scraper")
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def scraper(self, logger):
         """Create scraper instance"""
         return SemanticScholarScraper(logger, rate_limit_delay=0)
@@ -24,7 +29,7 @@ class TestSemanticScholarScraper:
         """Create scraper with API key"""
         return SemanticScholarScraper(logger, rate_limit_delay=0, api_key="test_key")
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def sample_ss_paper(self):
         """Sample Semantic Scholar paper response"""
         return {
@@ -52,15 +57,56 @@ class TestSemanticScholarScraper:
         assert scraper_with_key.api_key == "test_key"
         assert 'x-api-key' in scraper_with_key.headers
     
-    @patch('requests.get')
-    def test_search_success(self, mock_get, scraper, sample_ss_paper):
+    def test_uncached_by_default(self, scraper):
+        """Test no response cache is used unless a cache path is given"""
+        assert type(scraper.session) is requests.Session
+    
+    def test_cache_path_reuses_get_responses(self, logger, sample_ss_paper, tmp_path):
+        """Test repeated lookups are served from the requests-cache store"""
+        requests_cache = pytest.importorskip('requests_cache')
+        body = json.dumps(sample_ss_paper).encode()
+        
+        def send(adapter, request, **kwargs):
+            raw = HTTPResponse(body=io.BytesIO(body), status=200, preload_content=False,
+                               headers={'Content-Type': 'application/json'})
+            return adapter.build_response(request, raw)
+        
+        scraper = SemanticScholarScraper(logger, rate_limit_delay=0, cache_path=str(tmp_path / 'ss_cache'))
+        assert isinstance(scraper.session, requests_cache.CachedSession)
+        
+        with patch('requests.adapters.HTTPAdapter.send', autospec=True, side_effect=send) as mock_send:
+            first = scraper.get_paper_by_arxiv_id('2401.12345')
+            second = scraper.get_paper_by_arxiv_id('2401.12345')
+        
+        assert first['title'] == second['title'] == 'Test Paper'
+        assert mock_send.call_count == 1
+    
+    def test_cache_path_reuses_streamed_searches(self, logger, sample_ss_paper, tmp_path, monkeypatch):
+        """Test a repeated search is parsed from the cached body rather than the spent stream"""
+        pytest.importorskip('requests_cache')
+        monkeypatch.setattr('src.scrapers.semantic_scholar_scraper.ijson', pytest.importorskip('ijson'))
+        body = json.dumps({'data': [sample_ss_paper]}).encode()
+        
+        def send(adapter, request, **kwargs):
+            raw = HTTPResponse(body=io.BytesIO(body), status=200, preload_content=False,
+                               headers={'Content-Type': 'application/json'})
+            return adapter.build_response(request, raw)
+        
+        scraper = SemanticScholarScraper(logger, rate_limit_delay=0, cache_path=str(tmp_path / 'ss_cache'))
+        
+        with patch('requests.adapters.HTTPAdapter.send', autospec=True, side_effect=send) as mock_send:
+            first = scraper.search('machine learning')
+            second = scraper.search('machine learning')
+        
+        assert [p['title'] for p in first] == [p['title'] for p in second] == ['Test Paper']
+        assert mock_send.call_count == 1
+    
+    @patch('requests.Session.get')
+    def test_search_success(self, mock_get, scraper, sample_ss_paper, fake_resp):
         """Test successful search"""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
+        mock_get.return_value = fake_resp(json={
             'data': [sample_ss_paper]
-        }
-        mock_get.return_value = mock_response
+        })
         
         results = scraper.search('machine learning')
         
@@ -68,13 +114,10 @@ class TestSemanticScholarScraper:
         assert results[0]['title'] == 'Test Paper'
         assert results[0]['citation_count'] == 42
     
-    @patch('requests.get')
-    def test_search_with_filters(self, mock_get, scraper):
+    @patch('requests.Session.get')
+    def test_search_with_filters(self, mock_get, scraper, fake_resp):
         """Test search with year and field filters"""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {'data': []}
-        mock_get.return_value = mock_response
+        mock_get.return_value = fake_resp(json={'data': []})
         
         scraper.search(
             'AI',
@@ -87,26 +130,21 @@ class TestSemanticScholarScraper:
         params = call_args[1]['params']
         assert params['year'] == '2024-'
         assert 'Computer Science' in params['fieldsOfStudy']
+        assert params['fields'] is SemanticScholarScraper.FIELDS
     
-    @patch('requests.get')
-    def test_search_api_error(self, mock_get, scraper):
+    @patch('requests.Session.get')
+    def test_search_api_error(self, mock_get, scraper, fake_resp):
         """Test search with API error"""
-        mock_response = Mock()
-        mock_response.status_code = 429
-        mock_response.json.return_value = {'message': 'Rate limited'}
-        mock_get.return_value = mock_response
+        mock_get.return_value = fake_resp(status=429, json={'message': 'Rate limited'})
         
         results = scraper.search('test query')
         
         assert len(results) == 0
     
-    @patch('requests.get')
-    def test_get_paper_by_arxiv_id(self, mock_get, scraper, sample_ss_paper):
+    @patch('requests.Session.get')
+    def test_get_paper_by_arxiv_id(self, mock_get, scraper, sample_ss_paper, fake_resp):
         """Test getting paper by arXiv ID"""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = sample_ss_paper
-        mock_get.return_value = mock_response
+        mock_get.return_value = fake_resp(json=sample_ss_paper)
         
         paper = scraper.get_paper_by_arxiv_id('2401.12345v1')
         
@@ -115,12 +153,34 @@ class TestSemanticScholarScraper:
         # Should strip version number
         assert 'arXiv:2401.12345' in mock_get.call_args[0][0]
     
-    @patch('requests.get')
-    def test_get_paper_by_arxiv_id_not_found(self, mock_get, scraper):
+    @patch('requests.Session.get')
+    def test_get_paper_by_arxiv_id_keeps_inner_v(self, mock_get, scraper, sample_ss_paper, fake_resp):
+        """Test only a trailing version suffix is stripped from old-style IDs"""
+        mock_get.return_value = fake_resp(json=sample_ss_paper)
+        
+        scraper.get_paper_by_arxiv_id('solv-int/9901001v2')
+        assert mock_get.call_args[0][0].endswith('arXiv:solv-int/9901001')
+        
+        scraper.get_paper_by_arxiv_id('solv-int/9901001')
+        assert mock_get.call_args[0][0].endswith('arXiv:solv-int/9901001')
+    
+    @patch('requests.Session.get')
+    def test_get_paper_decodes_with_orjson(self, mock_get, scraper, sample_ss_paper, fake_resp, monkeypatch):
+        """Test response bodies are decoded from raw content when orjson is installed"""
+        monkeypatch.setattr('src.scrapers.semantic_scholar_scraper.orjson', pytest.importorskip('orjson'))
+        response = fake_resp(json=sample_ss_paper)
+        response.json = lambda: pytest.fail("orjson should decode response.content")
+        mock_get.return_value = response
+        
+        paper = scraper.get_paper_by_arxiv_id('2401.12345')
+        
+        assert paper['title'] == 'Test Paper'
+        assert paper['citation_count'] == 42
+    
+    @patch('requests.Session.get')
+    def test_get_paper_by_arxiv_id_not_found(self, mock_get, scraper, fake_resp):
         """Test getting non-existent paper"""
-        mock_response = Mock()
-        mock_response.status_code = 404
-        mock_get.return_value = mock_response
+        mock_get.return_value = fake_resp(status=404)
         
         paper = scraper.get_paper_by_arxiv_id('nonexistent')
         
@@ -153,60 +213,88 @@ class TestSemanticScholarScraper:
         assert normalized['paper_id'] == 'ss123'
         assert normalized['source'] == 'semantic_scholar'
     
-    @patch('requests.get')
-    def test_get_recent_papers(self, mock_get, scraper, sample_ss_paper):
+    @patch('requests.Session.get')
+    def test_get_recent_papers(self, mock_get, scraper, sample_ss_paper, fake_resp):
         """Test getting recent papers"""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {'data': [sample_ss_paper]}
-        mock_get.return_value = mock_response
+        mock_get.return_value = fake_resp(json={'data': [sample_ss_paper]})
         
         papers = scraper.get_recent_papers(['AI', 'ML'])
         
         assert len(papers) > 0
-        # Should only use first keyword (optimization)
+        # Without an API key only the first keyword is searched (rate limits)
         assert mock_get.call_count == 1
+        assert mock_get.call_args[1]['params']['query'] == 'AI'
     
-    @patch('requests.get')
-    def test_enrich_papers_with_citations(self, mock_get, scraper):
-        """Test enriching papers with citation data"""
+    @patch('requests.Session.get')
+    def test_get_recent_papers_with_key_searches_every_keyword(self, mock_get, scraper_with_key,
+                                                                sample_ss_paper, fake_resp):
+        """Test keyed clients search every keyword and keep repeated papers once"""
+        mock_get.return_value = fake_resp(json={'data': [sample_ss_paper]})
+        
+        keywords = ['AI', 'ML', 'robotics']
+        papers = scraper_with_key.get_recent_papers(keywords)
+        
+        assert mock_get.call_count == len(keywords)
+        assert len(papers) == 1
+    
+    def test_get_recent_papers_concurrency_follows_rate_limit(self, scraper, scraper_with_key):
+        """Test only one keyword is searched without a key and all run in parallel with one"""
+        keywords = [f'kw{i}' for i in range(12)]
+        
+        for instance, expected_searches, expected_workers in ((scraper, 1, 1), (scraper_with_key, 12, 10)):
+            with patch('src.scrapers.semantic_scholar_scraper.ThreadPoolExecutor',
+                       wraps=ThreadPoolExecutor) as mock_executor, \
+                 patch.object(instance, 'search', return_value=[]) as mock_search:
+                instance.get_recent_papers(keywords)
+            
+            assert mock_search.call_count == expected_searches
+            
+            mock_executor.assert_called_once_with(max_workers=expected_workers)
+    
+    @patch('requests.Session.post')
+    def test_enrich_papers_with_citations(self, mock_post, scraper, fake_resp):
+        """Test enriching papers with citation data in one batch request"""
         papers = [
-            {'paper_id': '2401.001', 'title': 'Paper 1'},
-            {'paper_id': '2401.002', 'title': 'Paper 2'}
+            {'paper_id': '2401.00001v2', 'title': 'Paper 1'},
+            {'paper_id': '2401.00002', 'title': 'Paper 2'}
         ]
         
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            'paperId': 'test',
-            'citationCount': 100
-        }
-        mock_get.return_value = mock_response
+        mock_post.return_value = fake_resp(json=[
+            {'paperId': 'ss1', 'citationCount': 100, 'influentialCitationCount': 7},
+            None  # Unknown to Semantic Scholar
+        ])
         
         enriched = scraper.enrich_papers_with_citations(papers, max_papers=2)
         
         assert len(enriched) == 2
+        assert mock_post.call_count == 1
+        _, kwargs = mock_post.call_args
+        assert kwargs['json'] == {'ids': ['ARXIV:2401.00001', 'ARXIV:2401.00002']}
+        assert enriched[0]['citation_count'] == 100
+        assert enriched[0]['semantic_scholar_id'] == 'ss1'
+        assert 'citation_count' not in enriched[1]
     
-    @patch('src.scrapers.semantic_scholar_scraper.requests.get')
-    def test_get_with_retry(self, mock_get, scraper, sample_ss_paper):
-        """Test retry logic"""
-        # First call fails with HTTPError, second succeeds
-        import requests
-        mock_response_fail = Mock()
-        mock_response_fail.status_code = 500
-        mock_response_fail.raise_for_status.side_effect = requests.HTTPError("500 Server Error")
+    @patch('requests.Session.post')
+    def test_enrich_splits_into_batches(self, mock_post, scraper, fake_resp):
+        """Test enrichment sends one request per BATCH_SIZE papers"""
+        papers = [{'paper_id': f'ss{i}', 'title': f'Paper {i}'} for i in range(scraper.BATCH_SIZE + 1)]
+        mock_post.return_value = fake_resp(json=[None] * scraper.BATCH_SIZE)
         
-        mock_response_success = Mock()
-        mock_response_success.status_code = 200
-        mock_response_success.json.return_value = sample_ss_paper
-        mock_response_success.raise_for_status.return_value = None
+        enriched = scraper.enrich_papers_with_citations(papers, max_papers=len(papers))
         
-        mock_get.side_effect = [mock_response_fail, mock_response_success]
-        
-        paper = scraper._get_with_retry('2401.12345', max_retries=3)
+        assert len(enriched) == len(papers)
+        batch_sizes = [len(c.kwargs['json']['ids']) for c in mock_post.call_args_list]
+        assert batch_sizes == [scraper.BATCH_SIZE, 1]
+    
+    def test_session_retries_transient_errors(self, scraper):
+        """Test retry/backoff is configured on the pooled session"""
+        adapter = scraper.session.get_adapter(scraper.BASE_URL)
+        retry = adapter.max_retries
         
-        assert paper is not None
-        assert mock_get.call_count == 2
+        assert retry.total == 5
+        assert retry.backoff_factor == 1
+        assert set(retry.status_forcelist) == {429, 500, 502, 503, 504}
+        assert retry.respect_retry_after_header
     
     def test_base_url(self, scraper):
         """Test BASE_URL is set"""